@@ -1,23 +1,47 @@
-from _Framework.ButtonElement import OFF_VALUE, ON_VALUE, ButtonElement as ButtonElementBase
+from _Framework.ButtonElement import OFF_VALUE, ON_VALUE, Color, ButtonElement as ButtonElementBase
+from _Framework.Skin import SkinColorMissingError
 
 class ButtonElement(ButtonElementBase):
     _on_value = None
     _off_value = None
+    _led_index = None
+    _led_buffer = None
+
+    def __init__(self, is_momentary, msg_type, channel, identifier, led_index=None, led_buffer=None, *a, **k):
+        super(ButtonElement, self).__init__(is_momentary, msg_type, channel, identifier, *a, **k)
+        self._led_index = led_index
+        self._led_buffer = led_buffer
 
     def reset(self):
         self._on_value = None
         self._off_value = None
         super(ButtonElement, self).reset()
 
+    # skin keys are resolved to midi values here, once, through the
+    # compiled skin so sending ON_VALUE or OFF_VALUE is a plain send
     def set_on_off_values(self, on_value, off_value):
-        self._on_value = on_value
-        self._off_value = off_value
+        self._on_value = self._resolve(on_value)
+        self._off_value = self._resolve(off_value)
+
+    def _resolve(self, key):
+        if key is None:
+            return None
+        midi_values = getattr(self._skin, "midi_values", None)
+        if midi_values is None:
+            return int(getattr(self._skin[key], "midi_value", 0))
+        if key not in midi_values:
+            raise SkinColorMissingError("Skin color missing: %s" % str(key))
+        return midi_values[key]
 
     def send_value(self, value, **k):
         if value is ON_VALUE and self._on_value is not None:
-            self._skin[self._on_value].draw(self)
+            value = self._on_value
+        elif value is OFF_VALUE and self._off_value is not None:
+            value = self._off_value
+        elif isinstance(value, Color):
+            value = value.midi_value
+
+        if self._led_buffer is not None and self._led_index is not None:
+            self._led_buffer.write(self._led_index, int(value), force=k.get("force", False))
         else:
-            if value is OFF_VALUE and self._off_value is not None:
-                self._skin[self._off_value].draw(self)
-            else:
-                (super(ButtonElement, self).send_value)(value, **k)
+            (super(ButtonElement, self).send_value)(value, **k)
@@ -0,0 +1,27 @@
+# two buttons that act when released, so that pressing both together can
+# be used as a combination of its own without either of them acting
+class ButtonPair(object):
+
+    def __init__(self, on_both_pressed=None):
+        self.on_both_pressed = on_both_pressed
+        self._held = set()
+        self._both_pressed = False
+
+    # feed every value of either button, identified by name. Returns True
+    # when the button was released and should act
+    def released(self, name, value):
+        if value:
+            self._held.add(name)
+            if len(self._held) == 2:
+                self._both_pressed = True
+                if self.on_both_pressed:
+                    self.on_both_pressed()
+            return False
+
+        if name not in self._held:
+            return False
+        self._held.discard(name)
+        both_pressed = self._both_pressed
+        if not self._held:
+            self._both_pressed = False
+        return not both_pressed
@@ -0,0 +1,217 @@
+import json
+import marshal
+import os
+
+from .DeviceTarget import TARGET_RULES
+from .MruCache import NUM_STRIPS
+from .Skin import DEFAULT_COLORS
+
+import logging
+logger = logging.getLogger(__name__)
+
+CONFIG_FILENAME = "DrumControlXL_config.json"
+CACHE_FILENAME = "DrumControlXL_config.cache"
+# bump when the compiled tables change shape, so old caches are ignored
+CACHE_VERSION = 2
+
+MAX_DEVICE_CONTROL_ROWS = 3
+
+# the Live template's mapping. Faders, encoders and the Up, Down, Left and
+# Right buttons send CCs, the other buttons send notes. Every row of
+# encoders controls one more parameter of the device device_target picks
+# in each pad's chain, see DeviceTarget. The layouts give the pads per
+# followed track when following 2 or 4 tracks
+DEFAULT_CONFIG = {
+    "channel": 8,
+    "faders": [77, 78, 79, 80, 81, 82, 83, 84],
+    "encoders": [
+        [13, 14, 15, 16, 17, 18, 19, 20],
+        [29, 30, 31, 32, 33, 34, 35, 36],
+        [49, 50, 51, 52, 53, 54, 55, 56],
+    ],
+    "select_buttons": [41, 42, 43, 44, 57, 58, 59, 60],
+    "state_buttons": [73, 74, 75, 76, 89, 90, 91, 92],
+    "buttons": {
+        "device": 105,
+        "mute": 106,
+        "solo": 107,
+        "arm": 108,
+        "up": 104,
+        "down": 105,
+        "left": 106,
+        "right": 107,
+    },
+    "layouts": {
+        "2": [4, 4],
+        "4": [2, 2, 2, 2],
+    },
+    "colors": {},
+    "device_target": "first",
+    "device_class": None,
+    "device_skip": ["StereoGain"],
+    "snapshot_morph_beats": 4,
+    "track_switch_delay": 0.15,
+}
+
+CC_BUTTONS = ("up", "down", "left", "right")
+NOTE_BUTTONS = ("device", "mute", "solo", "arm")
+
+class ConfigError(ValueError):
+    pass
+
+def script_directory():
+    return os.path.dirname(os.path.abspath(__file__))
+
+def _midi_number(value, name):
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= 127:
+        raise ConfigError("%s must be a number from 0 to 127, not %r" % (name, value))
+    return value
+
+def _midi_numbers(values, name, count=NUM_STRIPS):
+    if not isinstance(values, list) or len(values) != count:
+        raise ConfigError("%s must be a list of %d numbers" % (name, count))
+    return tuple(_midi_number(value, "%s %d" % (name, index + 1)) for index, value in enumerate(values))
+
+def _number(value, name, low, high):
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or not low <= value <= high:
+        raise ConfigError("%s must be a number from %s to %s, not %r" % (name, low, high, value))
+    return value
+
+def _device_target(settings):
+    rule = settings["device_target"]
+    if rule not in TARGET_RULES:
+        raise ConfigError("device_target must be one of %s, not %r" % (", ".join(TARGET_RULES), rule))
+    class_name = settings["device_class"]
+    if rule == "class" and (not isinstance(class_name, str) or not class_name):
+        raise ConfigError("device_target class needs the class name in device_class")
+    skip = settings["device_skip"]
+    if not isinstance(skip, list) or any(not isinstance(name, str) for name in skip):
+        raise ConfigError("device_skip must be a list of device class names")
+    return {"rule": rule, "class_name": class_name if rule == "class" else None, "skip": tuple(skip)}
+
+def _check_unique(numbers, kind):
+    seen = set()
+    for name, number in numbers:
+        if number in seen:
+            raise ConfigError("%s %d is used by more than one control, again by %s" % (kind, number, name))
+        seen.add(number)
+
+# validates a configuration, on top of the defaults, and compiles it into
+# the flat tables the script reads at startup. Raises ConfigError
+def compile_config(config):
+    if not isinstance(config, dict):
+        raise ConfigError("the configuration must be a JSON object")
+    unknown = sorted(set(config) - set(DEFAULT_CONFIG))
+    if unknown:
+        raise ConfigError("unknown settings: %s" % ", ".join(unknown))
+
+    settings = dict(DEFAULT_CONFIG)
+    settings.update(config)
+
+    buttons = dict(DEFAULT_CONFIG["buttons"])
+    if not isinstance(settings["buttons"], dict):
+        raise ConfigError("buttons must be an object")
+    unknown = sorted(set(settings["buttons"]) - set(buttons))
+    if unknown:
+        raise ConfigError("unknown buttons: %s" % ", ".join(unknown))
+    buttons.update(settings["buttons"])
+    buttons = dict((name, _midi_number(number, "button %s" % name)) for name, number in buttons.items())
+
+    encoders = settings["encoders"]
+    if not isinstance(encoders, list) or not 1 <= len(encoders) <= MAX_DEVICE_CONTROL_ROWS:
+        raise ConfigError("encoders must be a list of 1 to %d rows" % MAX_DEVICE_CONTROL_ROWS)
+    encoders = tuple(_midi_numbers(row, "encoders row %d" % (index + 1)) for index, row in enumerate(encoders))
+
+    tables = {
+        "channel": _number(settings["channel"], "channel", 0, 15),
+        "faders": _midi_numbers(settings["faders"], "faders"),
+        "encoders": encoders,
+        "select_buttons": _midi_numbers(settings["select_buttons"], "select_buttons"),
+        "state_buttons": _midi_numbers(settings["state_buttons"], "state_buttons"),
+        "buttons": buttons,
+        "snapshot_morph_beats": _number(settings["snapshot_morph_beats"], "snapshot_morph_beats", 0, 64),
+        "track_switch_delay": _number(settings["track_switch_delay"], "track_switch_delay", 0, 2),
+    }
+    if not isinstance(tables["channel"], int):
+        raise ConfigError("channel must be a whole number")
+
+    _check_unique([("fader %d" % (index + 1), number) for index, number in enumerate(tables["faders"])] +
+                  [("encoder %d.%d" % (row + 1, index + 1), number) for row, numbers in enumerate(encoders) for index, number in enumerate(numbers)] +
+                  [("button %s" % name, buttons[name]) for name in CC_BUTTONS], "CC")
+    _check_unique([("select button %d" % (index + 1), number) for index, number in enumerate(tables["select_buttons"])] +
+                  [("state button %d" % (index + 1), number) for index, number in enumerate(tables["state_buttons"])] +
+                  [("button %s" % name, buttons[name]) for name in NOTE_BUTTONS], "note")
+
+    layouts = dict(DEFAULT_CONFIG["layouts"])
+    if not isinstance(settings["layouts"], dict):
+        raise ConfigError("layouts must be an object")
+    layouts.update(settings["layouts"])
+    tables["layouts"] = {1: (NUM_STRIPS,)}
+    for num_tracks, widths in layouts.items():
+        if num_tracks not in ("2", "4"):
+            raise ConfigError("layouts can be given for 2 or 4 tracks, not %s" % num_tracks)
+        if not isinstance(widths, list) or len(widths) != int(num_tracks) or \
+                any(not isinstance(width, int) or width < 1 for width in widths) or sum(widths) != NUM_STRIPS:
+            raise ConfigError("the layout for %s tracks must be %s pad counts adding up to %d" % (num_tracks, num_tracks, NUM_STRIPS))
+        tables["layouts"][int(num_tracks)] = tuple(widths)
+
+    tables["device_target"] = _device_target(settings)
+
+    colors = dict(DEFAULT_COLORS)
+    if not isinstance(settings["colors"], dict):
+        raise ConfigError("colors must be an object")
+    for name, value in settings["colors"].items():
+        if name not in colors:
+            raise ConfigError("unknown color %s, colors are %s" % (name, ", ".join(sorted(colors))))
+        colors[name] = _midi_number(value, "color %s" % name)
+    tables["colors"] = colors
+    return tables
+
+def _read_cache(cache_path, stat):
+    try:
+        with open(cache_path, "rb") as f:
+            version, mtime, size, tables = marshal.load(f)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION or mtime != stat.st_mtime or size != stat.st_size:
+        return None
+    return tables
+
+def _write_cache(cache_path, stat, tables):
+    temporary_path = cache_path + ".tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            marshal.dump((CACHE_VERSION, stat.st_mtime, stat.st_size, tables), f)
+        os.replace(temporary_path, cache_path)
+    except (IOError, OSError) as e:
+        logger.warning("Could not cache the compiled configuration in %s: %s" % (cache_path, e))
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+# the compiled configuration from DrumControlXL_config.json next to the
+# script, or the defaults if there is none or it's invalid. The compiled
+# tables are cached next to it and used as long as the file's modification
+# time and size are unchanged, so startup doesn't parse and validate it
+def load_config(directory=None):
+    directory = directory or script_directory()
+    path = os.path.join(directory, CONFIG_FILENAME)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return compile_config({})
+
+    cache_path = os.path.join(directory, CACHE_FILENAME)
+    tables = _read_cache(cache_path, stat)
+    if tables is not None:
+        return tables
+
+    try:
+        with open(path) as f:
+            tables = compile_config(json.load(f))
+    except (IOError, OSError, ValueError) as e:
+        logger.error("Ignoring the configuration in %s: %s" % (path, e))
+        return compile_config({})
+
+    logger.info("Compiled the configuration in %s" % path)
+    _write_cache(cache_path, stat, tables)
+    return tables
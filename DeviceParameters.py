@@ -0,0 +1,57 @@
+from _Framework.SubjectSlot import Subject, SlotManager
+from _Generic.Devices import best_of_parameter_bank, device_parameters_to_map
+
+from .ListenerRegistry import listener_registry, listens
+from .MruCache import MruCache, STRIP_CACHE_SIZE
+
+import logging
+logger = logging.getLogger(__name__)
+
+# the parameters the device controls of a strip are connected to on one
+# device: Live's best of bank for the device if it has one, otherwise its
+# parameters after Device On, the same ones DeviceComponent maps on its
+# first bank. Resolved on first use and again only after the device's
+# parameters change, which strips hear about through the parameters event
+class DeviceParameters(SlotManager, Subject):
+    __events__ = ("parameters",)
+
+    def __init__(self, device, cache, *a, **k):
+        super(DeviceParameters, self).__init__(*a, **k)
+        self._device = device
+        self._cache = cache
+        self._parameters = None
+        self._on_parameters_changed.subject = device
+
+    @property
+    def device(self):
+        return self._device
+
+    @property
+    def parameters(self):
+        if self._device is None:
+            return ()
+        if self._parameters is None:
+            self._cache.resolved += 1
+            self._parameters = tuple(best_of_parameter_bank(self._device) or device_parameters_to_map(self._device))
+        return self._parameters
+
+    @listens("parameters")
+    def _on_parameters_changed(self):
+        self._parameters = None
+        self.notify_parameters()
+
+    def disconnect(self):
+        self._device = None
+        self._parameters = None
+        listener_registry.disconnect(self)
+        super(DeviceParameters, self).disconnect()
+
+# keeps the resolved parameters of recently bound devices, so paging back
+# and forth or returning to a track doesn't resolve them again. Strips pin
+# the entry of the device they're bound to
+class DeviceParameterCache(MruCache):
+
+    def __init__(self, size=STRIP_CACHE_SIZE):
+        super(DeviceParameterCache, self).__init__(
+            lambda device: DeviceParameters(device, self), lambda entry: entry.device, size, "parameters")
+        self.resolved = 0
@@ -0,0 +1,146 @@
+from _Framework.SubjectSlot import Subject, SlotManager
+
+from .ListenerRegistry import listener_registry, listens_group
+from .MruCache import MruCache, STRIP_CACHE_SIZE
+
+import logging
+logger = logging.getLogger(__name__)
+
+# how the device a pad's encoders control is picked from its chain:
+# "first" takes the chain's first device, "macros" the first rack found
+# in the chain or the racks nested in it, falling back to the first
+# device, "parameters" the first device that isn't a rack and has
+# automatable parameters, passing over the skipped class names, and
+# "class" the first device of the given class name
+TARGET_RULES = ("first", "macros", "parameters", "class")
+DEFAULT_TARGET = {"rule": "first", "class_name": None, "skip": ()}
+
+def is_rack(device):
+    return device.can_have_chains and not device.can_have_drum_pads
+
+def has_automatable_parameters(device):
+    return any(parameter.is_enabled for parameter in device.parameters[1:])
+
+def _matches(device, target):
+    rule = target["rule"]
+    if rule == "macros":
+        return is_rack(device)
+    if rule == "parameters":
+        return not is_rack(device) and device.class_name not in target["skip"] and has_automatable_parameters(device)
+    if rule == "class":
+        return device.class_name == target["class_name"]
+    return True
+
+# depth first search of a pad's chain for the device its encoders control,
+# going into the chains of racks but not of nested drum racks. Every chain
+# whose devices were looked at and every rack whose chains were looked at
+# is passed to visit, as a change to any of them can change the result
+def find_device_target(chain, target, visit=None):
+    if visit:
+        visit(chain, "devices")
+
+    for device in chain.devices:
+        if _matches(device, target):
+            return device
+        if is_rack(device):
+            if visit:
+                visit(device, "chains")
+            for nested_chain in device.chains:
+                found = find_device_target(nested_chain, target, visit)
+                if found is not None:
+                    return found
+    return None
+
+# the device a chain's encoders control under target, the macros rule
+# falling back to the chain's first device when there's no rack
+def resolve_device_target(chain, target, visit=None):
+    device = find_device_target(chain, target, visit)
+    if device is None and target["rule"] == "macros" and chain.devices:
+        device = chain.devices[0]
+    return device
+
+# the device one chain's encoders control, resolved on first use and again
+# only after a chain or rack along the search changed, which strips hear
+# about through the device event
+class DeviceTarget(SlotManager, Subject):
+    __events__ = ("device",)
+
+    def __init__(self, chain, cache, *a, **k):
+        super(DeviceTarget, self).__init__(*a, **k)
+        self._chain = chain
+        self._cache = cache
+        self._device = None
+        self._resolved = False
+
+    @property
+    def chain(self):
+        return self._chain
+
+    @property
+    def device(self):
+        if not self._resolved and self._chain is not None:
+            self._resolve()
+        return self._device
+
+    def _resolve(self):
+        self._cache.resolved += 1
+        target = self._cache.target
+        visited = {"devices": [], "chains": []}
+        self._device = resolve_device_target(self._chain, target, lambda subject, event: visited[event].append(subject))
+        self._resolved = True
+        self._on_devices_changed.replace_subjects(visited["devices"])
+        self._on_chains_changed.replace_subjects(visited["chains"])
+
+    def invalidate(self):
+        self._device = None
+        self._resolved = False
+        self.notify_device()
+
+    @listens_group("devices")
+    def _on_devices_changed(self, subject):
+        self.invalidate()
+
+    @listens_group("chains")
+    def _on_chains_changed(self, subject):
+        self.invalidate()
+
+    def disconnect(self):
+        self._chain = None
+        self._device = None
+        listener_registry.disconnect(self)
+        super(DeviceTarget, self).disconnect()
+
+# keeps the device targets of chains strips were recently bound to, so
+# rebuilding the strips after paging or switching tracks doesn't walk the
+# chains again. Strips pin the target of their chain, which keeps its
+# listeners connected while they follow it. Chains only looked up through
+# device are resolved without being kept
+class DeviceTargetCache(MruCache):
+
+    def __init__(self, target=DEFAULT_TARGET, size=STRIP_CACHE_SIZE):
+        super(DeviceTargetCache, self).__init__(
+            lambda chain: DeviceTarget(chain, self), lambda entry: entry.chain, size, "device target")
+        self._target = target
+        self.resolved = 0
+
+    @property
+    def target(self):
+        return self._target
+
+    # every target is resolved again under the new rule, the strips
+    # bound to them hear about it through their device event
+    def set_target(self, target):
+        if target == self._target:
+            return
+        self._target = target
+        for entry in list(self.entries):
+            entry.invalidate()
+
+    # the device of a chain no strip has to follow, taken from the cache
+    # if a strip was bound to it recently, otherwise resolved on the spot
+    def device(self, chain):
+        entry = self.find(chain)
+        if entry is not None:
+            return entry.device
+        self.resolved += 1
+        return resolve_device_target(chain, self._target)
@@ -1,6 +1,4 @@
-from builtins import chr, map, range
 from functools import partial
-from itertools import chain
 
 import Live
 from _Framework import Task
@@ -14,54 +12,128 @@ from _Framework.SessionComponent import SessionComponent
 from _Framework.SliderElement import SliderElement
 from _Framework.SubjectSlot import subject_slot
 from .ButtonElement import ButtonElement
-from .Skin import make_skin, make_default_skin
+from .ButtonPair import ButtonPair
+from .Config import load_config
+from .LedBuffer import LedBuffer
+from .ListenerRegistry import listener_registry
+from .Profiler import StartupTimer, profiler, timed
+from .Skin import Colors, apply_colors, make_skin, make_default_skin
+from .Snapshots import SnapshotComponent
+from .Trace import tracer
 from .DrumGroupMixerComponent import DrumGroupMixerComponent
+from .UnitCoordinator import get_coordinator
 
 import logging
 logger = logging.getLogger(__name__)
 
 NUM_TRACKS = 1
-LIVE_CHANNEL = 8
+NUM_PADS = 8
 PREFIX_TEMPLATE_SYSEX = (240, 0, 32, 41, 2, 17, 119)
-LIVE_TEMPLATE_SYSEX = PREFIX_TEMPLATE_SYSEX + (LIVE_CHANNEL, 247)
+# pressing Track Left and Right together steps through following 1, 2 or 4 tracks
+NEXT_NUM_TRACKS = {1: 2, 2: 4, 4: 1}
 
+# LED indices used by the Launch Control XL "set LEDs" sysex
+LED_TOP_KNOBS = 0
+LED_BOTTOM_KNOBS = 8
+LED_PAN_KNOBS = 16
+LED_TRACK_FOCUS = 24
+LED_TRACK_CONTROL = 32
+LED_DEVICE = 40
+LED_MUTE = 41
+LED_SOLO = 42
+LED_ARM = 43
+LED_UP = 44
+LED_DOWN = 45
+LED_LEFT = 46
+LED_RIGHT = 47
+
+# startup is split into tiers so a unit costs Live next to nothing while
+# a set loads: the script only reads its configuration and registers, the
+# device is identified and asked for the Live template, and the controls
+# and components are built once it's on it. Snapshots are only built
+# when they're first used
 class DrumControlXL(IdentifiableControlSurface):
     _drum_group_mixer = None
+    _mixer_modes = None
+    _snapshots = None
+    _syncing_session = False
+    _volume_faders = None
+    _left_button = None
+    _right_button = None
+    _startup_timer = None
 
     def __init__(self, c_instance, *a, **k):
+        startup_timer = StartupTimer("Startup")
         super(DrumControlXL, self).__init__(c_instance=c_instance, product_id_bytes=(0, 32, 41, 97), *a, **k)
         logging.info("Initializing DrumControlXL")
-        self._biled_skin = make_biled_skin()
-        self._default_skin = make_default_skin()
-        self._skin = make_skin()
-        with self.component_guard():
-            self._create_controls()
+        self._startup_timer = startup_timer
+        # the channel is the template the script uses, 8 for the Live template
+        self._config = load_config()
+        self._channel = self._config["channel"]
+        self._led_buffer = LedBuffer(self._send_midi, self._channel)
+        self._coordinator = get_coordinator()
+        self._coordinator.device_target_cache.set_target(self._config["device_target"])
+        self._unit_offset = 0
+        self._bank_size = NUM_PADS
+        self._track_buttons = ButtonPair(self._cycle_num_tracks)
+        self._coordinator.register(self)
         self._initialize_task = self._tasks.add(Task.sequence(Task.wait(1), Task.run(self._create_components)))
         self._initialize_task.kill()
+        self._select_track_task = self._tasks.add(Task.run(self._select_session_track))
+        self._select_track_task.kill()
+        self._startup_timer.mark("script")
 
+    # identifying again means the device reconnected, which is timed too
     def on_identified(self):
+        if self._startup_timer is None:
+            self._startup_timer = StartupTimer("Reconnect")
+        self._startup_timer.mark("identified")
         self._send_live_template()
 
+    def _finish_startup(self):
+        if self._startup_timer:
+            self._startup_timer.finish()
+            self._startup_timer = None
+
+    # the components are built with their lights sent right away instead
+    # of on the next display tick
+    @timed("DrumControlXL._create_components")
     def _create_components(self):
         self._initialize_task.kill()
+        if self._startup_timer:
+            self._startup_timer.mark("template")
         self._disconnect_and_unregister_all_components()
+        self._snapshots = None
         with self.component_guard():
+            if self._volume_faders is None:
+                self._create_controls()
+                if self._startup_timer:
+                    self._startup_timer.mark("controls")
             session = self._create_session()
             self._create_drum_group_mixer(session)
+            self._drum_group_mixer.on_shifted_strip_button = self._on_shifted_strip_button
+        if self._startup_timer:
+            self._startup_timer.mark("components")
+        self._led_buffer.flush()
+        self._finish_startup()
 
     def _create_drum_group_mixer(self, session):
-        if self._drum_group_mixer:
-            self._drum_group_mixer.disconnect()
-            self._drum_group_mixer = None
-
-        self._drum_group_mixer = DrumGroupMixerComponent()
+        self._drum_group_mixer = DrumGroupMixerComponent(self._coordinator.pad_index_cache, self._coordinator.num_tracks,
+            self._coordinator.device_parameter_cache, self._config["layouts"], self._coordinator.device_target_cache)
+        self._drum_group_mixer.set_unit_offset(self._unit_offset, self._bank_size)
         self._drum_group_mixer.set_session(session)
+        self._coordinator.bind_unit(self, session.track_offset(), session.tracks_to_use())
+        self._drum_group_mixer.bank_selector = self._coordinator.select_bank
 
         self._drum_group_mixer.set_volume_controls(self._volume_faders)
         self._drum_group_mixer.set_device_controls(self._device_encoders)
         self._drum_group_mixer.set_pad_select_buttons(self._select_buttons)
         self._drum_group_mixer.set_arm_button(self._pan_device_mode_button)
-        self._drum_group_mixer.update_selected_lights()
+        self._drum_group_mixer.set_bank_up_button(self._up_button)
+        self._drum_group_mixer.set_bank_down_button(self._down_button)
+        self._drum_group_mixer.on_bank_changed = partial(self._show_controlled_pads_message, self._drum_group_mixer)
+        self._drum_group_mixer.on_bank_buttons_combo = self._toggle_timings
+        self._drum_group_mixer.on_shifted_bank_buttons_combo = self._toggle_trace
 
         mixer_modes = ModesComponent()
         mixer_modes.add_mode("mute", [AddLayerMode(self._drum_group_mixer, Layer(mute_buttons=(self._state_buttons)))])
@@ -71,55 +143,77 @@ class DrumControlXL(IdentifiableControlSurface):
             solo_button=(self._solo_mode_button),
             arm_button=(self._arm_mode_button))
         mixer_modes.selected_mode = "mute"
+        self._mixer_modes = mixer_modes
 
-        self._drum_group_mixer.update_mute_lights()
+    @property
+    def mixer_mode(self):
+        return self._mixer_modes.selected_mode if self._mixer_modes else None
 
-    def _create_controls(self):
+    # built on the first snapshot stored or recalled
+    @property
+    def snapshots(self):
+        if self._snapshots is None and self._drum_group_mixer:
+            with self.component_guard():
+                self._snapshots = SnapshotComponent(self._drum_group_mixer, self._coordinator.unit_index(self),
+                    morph_beats=self._config["snapshot_morph_beats"])
+        return self._snapshots
+
+    # with the arm button held, the track focus buttons recall and the
+    # track control buttons store the snapshot of their number
+    def _on_shifted_strip_button(self, name, index):
+        if name == "select":
+            self.snapshots.recall(index)
+        elif name == "state":
+            self.snapshots.store(index)
+
+    def _make_button(self, identifier, name, led_index, midi_type=MIDI_CC_TYPE, skin=None):
+        return ButtonElement(True,
+          midi_type, self._channel, identifier, name=name, skin=skin if skin is not None else self._default_skin,
+          led_index=led_index, led_buffer=self._led_buffer)
 
-        def make_button(identifier, name, midi_type=MIDI_CC_TYPE, skin=self._default_skin):
-            return ButtonElement(True,
-              midi_type, LIVE_CHANNEL, identifier, name=name, skin=skin)
+    def _make_button_list(self, identifiers, name, first_led_index):
+        return [self._make_button(identifier, name % (i + 1), first_led_index + i, MIDI_NOTE_TYPE, self._skin) for i, identifier in enumerate(identifiers)]
 
-        def make_button_list(identifiers, name):
-            return [make_button(identifier, name % (i + 1), MIDI_NOTE_TYPE, self._skin) for i, identifier in enumerate(identifiers)]
+    def _create_controls(self):
+        apply_colors(self._config["colors"])
+        self._default_skin = make_default_skin()
+        self._skin = make_skin()
+        make_button = self._make_button
+        make_button_list = self._make_button_list
 
         def make_encoder(identifier, name):
             return EncoderElement(MIDI_CC_TYPE,
-              LIVE_CHANNEL,
+              self._channel,
               identifier,
               (Live.MidiMap.MapMode.absolute),
               name=name)
 
         def make_slider(identifier, name):
-            return SliderElement(MIDI_CC_TYPE, LIVE_CHANNEL, identifier, name=name)
+            return SliderElement(MIDI_CC_TYPE, self._channel, identifier, name=name)
 
+        config = self._config
+        buttons = config["buttons"]
+        encoder_names = ("Top_Send_%d", "Bottom_Send_%d", "Device_%d")
         self._device_encoders = ButtonMatrixElement(rows=[
-            [make_encoder(13 + i, "Top_Send_%d" % (i + 1)) for i in range(8)],
-            [make_encoder(29 + i, "Bottom_Send_%d" % (i + 1)) for i in range(8)],
-            [make_encoder(49 + i, "Device_%d" % (i + 1)) for i in range(8)]
+            [make_encoder(identifier, encoder_names[row] % (i + 1)) for i, identifier in enumerate(identifiers)]
+            for row, identifiers in enumerate(config["encoders"])
         ])
         self._volume_faders = ButtonMatrixElement(rows=[
-         [make_slider(77 + i, "Volume_%d" % (i + 1)) for i in range(8)]])
-        self._pan_device_mode_button = make_button(105, "Pan_Device_Mode", MIDI_NOTE_TYPE)
-        self._mute_mode_button = make_button(106, "Mute_Mode", MIDI_NOTE_TYPE)
-        self._solo_mode_button = make_button(107, "Solo_Mode", MIDI_NOTE_TYPE)
-        self._arm_mode_button = make_button(108, "Arm_Mode", MIDI_NOTE_TYPE)
-        self._up_button = make_button(104, "Up")
-        self._down_button = make_button(105, "Down")
-        self._left_button = make_button(106, "Track_Left")
-        self._right_button = make_button(107, "Track_Right")
+         [make_slider(identifier, "Volume_%d" % (i + 1)) for i, identifier in enumerate(config["faders"])]])
+        self._pan_device_mode_button = make_button(buttons["device"], "Pan_Device_Mode", LED_DEVICE, MIDI_NOTE_TYPE, self._skin)
+        self._mute_mode_button = make_button(buttons["mute"], "Mute_Mode", LED_MUTE, MIDI_NOTE_TYPE)
+        self._solo_mode_button = make_button(buttons["solo"], "Solo_Mode", LED_SOLO, MIDI_NOTE_TYPE)
+        self._arm_mode_button = make_button(buttons["arm"], "Arm_Mode", LED_ARM, MIDI_NOTE_TYPE)
+        self._up_button = make_button(buttons["up"], "Up", LED_UP)
+        self._down_button = make_button(buttons["down"], "Down", LED_DOWN)
+        self._left_button = make_button(buttons["left"], "Track_Left", LED_LEFT)
+        self._right_button = make_button(buttons["right"], "Track_Right", LED_RIGHT)
+        self._on_track_left_value.subject = self._left_button
+        self._on_track_right_value.subject = self._right_button
         self._select_buttons = ButtonMatrixElement(rows=[
-         make_button_list(chain(range(41, 45), range(57, 61)), "Track_Select_%d")])
+         make_button_list(config["select_buttons"], "Track_Select_%d", LED_TRACK_FOCUS)])
         self._state_buttons = ButtonMatrixElement(rows=[
-         make_button_list(chain(range(73, 77), range(89, 93)), "Track_State_%d")])
-        self._send_encoder_lights = ButtonMatrixElement(rows=[
-         make_button_list([
-          13, 29, 45, 61, 77, 93, 109, 125], "Top_Send_Encoder_Light_%d"),
-         make_button_list([
-          14, 30, 46, 62, 78, 94, 110, 126], "Bottom_Send_Encoder_Light_%d")])
-        self._pan_device_encoder_lights = ButtonMatrixElement(rows=[
-         make_button_list([
-          15, 31, 47, 63, 79, 95, 111, 127], "Pan_Device_Encoder_Light_%d")])
+         make_button_list(config["state_buttons"], "Track_State_%d", LED_TRACK_CONTROL)])
 
     # def _create_mixer(self):
     #     mixer = MixerComponent(NUM_TRACKS, is_enabled=True, auto_name=True)
@@ -149,35 +243,235 @@ class DrumControlXL(IdentifiableControlSurface):
           is_enabled=True,
           auto_name=True,
           enable_skinning=True)
-        session.layer = Layer(track_bank_left_button=(self._left_button),
-          track_bank_right_button=(self._right_button))
+        session.set_offsets(self._coordinator.track_offset, session.scene_offset())
         self._on_session_offset_changed.subject = session
+        self._update_track_lights()
         return session
 
+    # Track Left and Right move by the number of tracks followed, when
+    # released so that pressing both can switch that number instead
+    @subject_slot("value")
+    def _on_track_left_value(self, value):
+        if self._track_buttons.released("left", value):
+            self._move_tracks(-1)
+
+    @subject_slot("value")
+    def _on_track_right_value(self, value):
+        if self._track_buttons.released("right", value):
+            self._move_tracks(1)
+
+    def _move_tracks(self, direction):
+        session = self._on_session_offset_changed.subject
+        if not session:
+            return
+        offset = session.track_offset() + direction * self._coordinator.num_tracks
+        offset = max(0, min(offset, len(session.tracks_to_use()) - 1))
+        if offset != session.track_offset():
+            session.set_offsets(offset, session.scene_offset())
+
+    def _cycle_num_tracks(self):
+        session = self._on_session_offset_changed.subject
+        if not session:
+            return
+        num_tracks = NEXT_NUM_TRACKS[self._coordinator.num_tracks]
+        self._select_track_task.kill()
+        self._coordinator.set_num_tracks(num_tracks, session.tracks_to_use())
+        widths = self._config["layouts"][num_tracks]
+        if len(set(widths)) == 1:
+            pads = "%d pads each" % widths[0]
+        else:
+            pads = "%s pads" % "+".join(str(width) for width in widths)
+        self.show_message("Following %d track%s, %s" % (num_tracks, "s" if num_tracks > 1 else "", pads))
+
+    def _update_track_lights(self):
+        if not self._left_button:
+            return
+        session = self._on_session_offset_changed.subject
+        offset = session.track_offset() if session else 0
+        num_tracks = len(session.tracks_to_use()) if session else 0
+        self._left_button.send_value(Colors.DrumGroup.TrackAvailable if offset > 0 else Colors.DrumGroup.TrackUnavailable)
+        self._right_button.send_value(Colors.DrumGroup.TrackAvailable if offset + self._coordinator.num_tracks < num_tracks else Colors.DrumGroup.TrackUnavailable)
+
+    # the message follows every step right away, but binding waits until
+    # scrolling stops so only the track landed on is bound
     @subject_slot("offset")
+    @timed("DrumControlXL._on_session_offset_changed")
     def _on_session_offset_changed(self):
+        if self._syncing_session:
+            return
+
+        self._show_controlled_tracks_message(self._on_session_offset_changed.subject)
+        self._update_track_lights()
+        self._coordinator.track_switch_pending()
+        self._select_track_task.kill()
+        self._select_track_task = self._tasks.add(Task.sequence(Task.wait(self._config["track_switch_delay"]), Task.run(self._select_session_track)))
+
+    def _select_session_track(self):
+        session = self._on_session_offset_changed.subject
+        if session:
+            self._coordinator.select_track(session.track_offset(), session.tracks_to_use())
+
+    # called by the coordinator for every unit when any of them changed track
+    @timed("DrumControlXL.set_controlled_tracks")
+    def set_controlled_tracks(self, track_offset, tracks, drum_group_devices, bank_offset=None):
         session = self._on_session_offset_changed.subject
-        self._show_controlled_tracks_message(session)
-        self._create_drum_group_mixer(session)
+        if not session or not self._drum_group_mixer:
+            return
+
+        if session.track_offset() != track_offset:
+            self._syncing_session = True
+            try:
+                session.set_offsets(track_offset, session.scene_offset())
+            finally:
+                self._syncing_session = False
+            self._update_track_lights()
+
+        self._drum_group_mixer.set_tracks(tracks, drum_group_devices, bank_offset)
+        logger.debug("Rebound drum group mixer: %(strips_reused)d strips reused, %(strips_created)d created, "
+            "device parameters %(device_parameters_cached)d times cached, %(device_parameters_resolved)d times resolved" % self._drum_group_mixer.allocation_stats())
+
+    def set_unit_offset(self, unit_offset, bank_size):
+        self._unit_offset = unit_offset
+        self._bank_size = bank_size
+        if self._drum_group_mixer:
+            self._drum_group_mixer.set_unit_offset(unit_offset, bank_size)
+
+    def set_num_tracks(self, num_tracks):
+        if self._drum_group_mixer:
+            self._drum_group_mixer.set_num_tracks(num_tracks)
+        self._update_track_lights()
+
+    def cancel_prefetch(self):
+        if self._drum_group_mixer:
+            self._drum_group_mixer.cancel_prefetch()
+
+    def set_bank_offset(self, bank_offset):
+        if self._drum_group_mixer:
+            self._drum_group_mixer.set_bank_offset(bank_offset)
 
     def _show_controlled_tracks_message(self, session):
         start = session.track_offset() + 1
-        end = min(start + (NUM_TRACKS-1), len(session.tracks_to_use()))
+        end = min(start + (self._coordinator.num_tracks - 1), len(session.tracks_to_use()))
         if start < end:
             self.show_message("Controlling Track %d to %d" % (start, end))
         else:
             self.show_message("Controlling Track %d" % start)
 
+    def update_display(self):
+        if tracer.recording:
+            tracer.tick(self._coordinator.unit_index(self))
+            with tracer.handling():
+                super(DrumControlXL, self).update_display()
+        else:
+            super(DrumControlXL, self).update_display()
+        self._led_buffer.flush()
+        tracer.flush()
+
+    def receive_midi(self, midi_bytes):
+        if tracer.recording:
+            tracer.midi(self._coordinator.unit_index(self), midi_bytes)
+            with tracer.handling():
+                super(DrumControlXL, self).receive_midi(midi_bytes)
+        else:
+            super(DrumControlXL, self).receive_midi(midi_bytes)
+
+    # the components turn their lights off when they're disconnected, which
+    # is sent while the surface can still send MIDI
+    def disconnect(self):
+        tracer.stop()
+        self._disconnect_and_unregister_all_components()
+        self._led_buffer.flush()
+        logger.info("LED buffer: %(messages_sent)d messages sent for %(leds_sent)d LEDs, "
+            "%(writes_skipped)d redundant writes skipped, %(writes_coalesced)d coalesced" % self._led_buffer.stats())
+        super(DrumControlXL, self).disconnect()
+        self._drum_group_mixer = None
+        self._mixer_modes = None
+        self._snapshots = None
+        self._coordinator.unregister(self)
+        listener_registry.log_stats()
+
+    def _show_controlled_pads_message(self, mixer):
+        messages = []
+        for segment in mixer.segments:
+            start = segment.pad_offset + 1
+            end = min(segment.pad_offset + segment.width, segment.num_pads)
+            if start > end:
+                messages.append("no pads left to control, %d in rack" % segment.num_pads)
+            else:
+                messages.append("Pads %d to %d of %d" % (start, end, segment.num_pads))
+        self.show_message("Controlling " + ", ".join(messages))
+
+    # the components are built once the device confirms the template, or
+    # a second later if it doesn't. A device that reconnects after they
+    # were created gets their state back when it confirms, see handle_sysex
     def _send_live_template(self):
-        self._send_midi(LIVE_TEMPLATE_SYSEX)
-        self._initialize_task.restart()
+        self._send_midi(PREFIX_TEMPLATE_SYSEX + (self._channel, 247))
+        if not self._drum_group_mixer:
+            self._initialize_task.kill()
+            self._initialize_task = self._tasks.add(Task.sequence(Task.wait(1), Task.run(self._create_components)))
+
+    # the hardware loses the Live template's LEDs while another template
+    # is selected or the device is away. The LED buffer holds what every
+    # LED should show, so it's sent again in one burst of sysex without
+    # asking Live about anything, the MIDI mappings are kept by Live
+    @timed("DrumControlXL._restore_surface")
+    def _restore_surface(self):
+        self._led_buffer.invalidate()
+        self._led_buffer.flush()
+
+    # pressing Up and Down together starts timing the hot paths, pressing
+    # them together again writes the timings next to Live's Log.txt
+    def _toggle_timings(self):
+        if not profiler.enabled:
+            profiler.reset()
+            profiler.start()
+            self.show_message("Timing started, press Up and Down together again to write the timings")
+            return
+
+        path = profiler.dump()
+        profiler.stop()
+        if path:
+            self.show_message("Timings written to %s" % path)
+        else:
+            self.show_message("Could not write timings, see Log.txt")
+
+    # pressing Up and Down together with the Device button held starts
+    # recording a trace, doing it again writes the trace next to Log.txt
+    def _toggle_trace(self):
+        if not tracer.recording:
+            if tracer.start(self._coordinator.num_units, state=self._trace_state()):
+                self.show_message("Recording started, hold Device and press Up and Down together again to write the trace")
+            else:
+                self.show_message("Could not record a trace, see Log.txt")
+            return
+
+        path = tracer.stop()
+        if path:
+            self.show_message("Trace written to %s" % path)
+        else:
+            self.show_message("Could not write the trace, see Log.txt")
+
+    # what replaying a trace has to start from to land on the same pads
+    def _trace_state(self):
+        session = self._on_session_offset_changed.subject
+        segments = self._drum_group_mixer.segments if self._drum_group_mixer else []
+        return {
+            "track_offset": self._coordinator.track_offset,
+            "num_tracks": self._coordinator.num_tracks,
+            "bank_offset": self._coordinator.bank_offset,
+            "modes": [unit.mixer_mode for unit in self._coordinator.units],
+            "set_tracks": len(session.tracks_to_use()) if session else 0,
+            "pads": max([segment.num_pads for segment in segments] or [0]),
+        }
 
+    @timed("DrumControlXL.handle_sysex")
     def handle_sysex(self, midi_bytes):
         if midi_bytes[:7] == PREFIX_TEMPLATE_SYSEX:
-            if midi_bytes[7] == LIVE_CHANNEL:
-                if self._initialize_task.is_running:
+            if midi_bytes[7] == self._channel:
+                if not self._drum_group_mixer:
                     self._create_components()
                 else:
-                    self.update()
+                    self._restore_surface()
+                    self._finish_startup()
         else:
             super(DrumControlXL, self).handle_sysex(midi_bytes)
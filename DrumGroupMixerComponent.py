@@ -1,68 +1,181 @@
 from builtins import range
-from future.moves.itertools import zip_longest
 import Live
 
+from _Framework import Task
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
-from _Framework.DeviceComponent import DeviceComponent
-from _Framework.ButtonElement import ON_VALUE, OFF_VALUE, Color
-from _Framework.Util import find_if
-
+from _Framework.SubjectSlot import SlotManager, subject_slot
+
+from .ButtonPair import ButtonPair
+from .DeviceParameters import DeviceParameterCache
+from .DeviceTarget import DeviceTargetCache
+from .GroupVolume import GroupVolumeMove, volume_to_db
+from .ListenerRegistry import listener_registry, listens
+from .MruCache import NUM_STRIPS
+from .PadIndex import make_pad_index_cache
+from .Profiler import timed
 from .Skin import Colors
 
 import logging
 logger = logging.getLogger(__name__)
 
+def same_chain(chain, other):
+    if chain is None or other is None:
+        return chain is other
+    return chain == other
+
 # represent a single drum pad, assuming a single chain,
 # allowing control of the chains volume, mute and solo
-# as well as the chains first device's parameters
+# as well as the parameters of the device the chain's target rule picks
 class DrumChainStripComponent(ControlSurfaceComponent):
     _chain = None
     _device = None
-    _device_controls = []
-    _device_component = None
+    _device_target = None
+    _device_controls = None
+    _device_parameters = None
     _volume_control = None
+    _volume_grouped = False
 
     _select_button = None
-    _mute_button = None
+    _state_button = None
+    _state_mode = "mute"
+    _shown_state_button = None
+    _shown_state_color = None
+    _is_selected = False
+    _is_track_armed = False
+
+    # called with the strip, "select" or "state" and the value of every
+    # button press, returns True when it handled the press instead
+    button_filter = None
 
-    def __init__(self, *a, **k):
+    # called with the strip when its state button is pressed in arm mode
+    arm_handler = None
+
+    # called with the strip and every value of its volume control while
+    # the mixer groups the volumes
+    volume_handler = None
+
+    def __init__(self, device_parameter_cache=None, device_target_cache=None, *a, **k):
         super(DrumChainStripComponent, self).__init__(*a, **k)
 
         def make_button_slot(name):
             return self.register_slot(None, getattr(self, "_%s_value" % name), "value")
 
         self._select_button_slot = make_button_slot("select")
-        self._mute_button_slot = make_button_slot("mute")
+        self._state_button_slot = make_button_slot("state")
+        self._volume_control_slot = self.register_slot(None, self._volume_value, "value")
 
         self._chain = None
+        self._state_colors = {}
+        self._device_parameter_cache = device_parameter_cache or DeviceParameterCache()
+        self._device_target_cache = device_target_cache or DeviceTargetCache()
+
+    @property
+    def chain(self):
+        return self._chain
 
+    @property
+    def device(self):
+        return self._device
+
+    # rebinds the strip to another chain, leaving it alone if it
+    # already controls that chain so its mappings and lights stay put
     def set_chain(self, chain):
+        if same_chain(chain, self._chain):
+            return
+
         self._chain = chain
-        self._chain.add_devices_listener(self._on_devices_changed)
-        self._chain.add_mute_listener(self._on_mute_changed)
-        self._chain.canonical_parent.view.add_selected_drum_pad_listener(self._on_selected_drum_pad_changed)
-        self._device = self._chain.devices[0] if self._chain else None
+        self._is_selected = False
+        self._state_colors = {}
+        self._device_target_cache.unpin(self._device_target)
+        self._device_target = self._device_target_cache.get(chain) if chain is not None else None
+        self._device_target_cache.pin(self._device_target)
+        self._on_device_target_changed.subject = self._device_target
+        self._on_mute_changed.subject = chain
+        self._on_solo_changed.subject = chain
+        self._set_device(self._target_device())
+
+        self.update()
+        self.update_state_lights()
+        self.update_selected_lights()
 
-    def _on_devices_changed(self):
-        self._device = self._chain.devices[0] if self._chain else None
-        self._update_device_component()
+    def _target_device(self):
+        return self._device_target.device if self._device_target else None
 
-    def _on_mute_changed(self):
-        self.update_mute_lights()
+    def _set_device(self, device):
+        self._device = device
+        self._device_parameter_cache.unpin(self._device_parameters)
+        self._device_parameters = self._device_parameter_cache.get(device) if device is not None else None
+        self._device_parameter_cache.pin(self._device_parameters)
+        self._on_device_parameters_changed.subject = self._device_parameters
 
-    def update_mute_lights(self):
-        if not self._mute_button:
+    @subject_slot("device")
+    def _on_device_target_changed(self):
+        device = self._target_device()
+        if same_chain(device, self._device):
             return
+        self._set_device(device)
+        self._connect_device_controls()
+
+    @subject_slot("parameters")
+    def _on_device_parameters_changed(self):
+        self._connect_device_controls()
 
+    @listens("mute")
+    def _on_mute_changed(self):
+        self._invalidate_state_color("mute")
+
+    @listens("solo")
+    def _on_solo_changed(self):
+        self._invalidate_state_color("solo")
+
+    # the color of the state button in every mode is kept until the chain
+    # or what the mode shows of it changes, so switching modes only looks
+    # up colors instead of reading the chain again
+    def state_color(self, mode):
+        color = self._state_colors.get(mode)
+        if color is None:
+            color = self._state_colors[mode] = self._read_state_color(mode)
+        return color
+
+    def _read_state_color(self, mode):
         if not self._chain:
-            self._mute_button.send_value(Colors.DrumGroup.NoChain)
+            return Colors.DrumGroup.NoChain
+        if mode == "mute":
+            return Colors.DrumGroup.MuteOn if self._chain.mute else Colors.DrumGroup.MuteOff
+        if mode == "solo":
+            return Colors.DrumGroup.SoloOn if self._chain.solo else Colors.DrumGroup.SoloOff
+        return Colors.DrumGroup.PadArmed if self._is_selected and self._is_track_armed else Colors.DrumGroup.PadUnarmed
+
+    def _invalidate_state_color(self, mode):
+        self._state_colors.pop(mode, None)
+        if mode == self._state_mode:
+            self.update_state_lights()
+
+    # sends the color of the current mode if the button shows another one
+    @timed("DrumChainStripComponent.update_state_lights")
+    def update_state_lights(self):
+        if not self._state_button:
             return
 
-        self._mute_button.send_value(Color(15) if self._chain.mute else Color(29))
-
-    def _on_selected_drum_pad_changed(self):
-        self.update_selected_lights()
-
+        color = self.state_color(self._state_mode)
+        if color is not self._shown_state_color:
+            self._shown_state_color = color
+            self._state_button.send_value(color)
+
+    # the mixer tracks which pad is selected and tells the strips
+    def set_selected(self, selected):
+        if selected != self._is_selected:
+            self._is_selected = selected
+            self.update_selected_lights()
+            self._invalidate_state_color("arm")
+
+    # the segment tells its strips whether its track is armed
+    def set_track_armed(self, armed):
+        if armed != self._is_track_armed:
+            self._is_track_armed = armed
+            self._invalidate_state_color("arm")
+
+    @timed("DrumChainStripComponent.update_selected_lights")
     def update_selected_lights(self):
         if not self._select_button:
             return
@@ -71,49 +184,81 @@ class DrumChainStripComponent(ControlSurfaceComponent):
             self._select_button.send_value(Colors.DrumGroup.NoChain)
             return
 
-        selected_drum_pad = self._chain.canonical_parent.view.selected_drum_pad
-        selected_chain = None
-        if selected_drum_pad.chains and len(selected_drum_pad.chains) > 0:
-            selected_chain = selected_drum_pad.chains[0]
-
-        if selected_chain and selected_chain == self._chain:
+        if self._is_selected:
             self._select_button.send_value(Colors.DrumGroup.PadSelected)
         else:
             self._select_button.send_value(Colors.DrumGroup.PadUnselected)
 
     def set_volume_control(self, control):
-        if self._volume_control:
+        if self._volume_control and self._volume_control != control:
             self._volume_control.release_parameter()
         self._volume_control = control
-        self.update()
+        self._volume_control_slot.subject = control
+        self._connect_volume_control()
+
+    # while grouped the volume control is released, so its values reach
+    # the script and go to the volume handler instead of Live's mapping
+    def set_volume_grouped(self, grouped):
+        if grouped != self._volume_grouped:
+            self._volume_grouped = grouped
+            self._connect_volume_control()
+
+    # the volume control is mapped in Live, and left alone if it's
+    # already mapped to the chain's volume so the MIDI map isn't rebuilt
+    def _connect_volume_control(self):
+        if not self._volume_control:
+            return
+        parameter = self._chain.mixer_device.volume if self._chain and not self._volume_grouped else None
+        if parameter is None:
+            self._volume_control.release_parameter()
+        elif self._volume_control.mapped_parameter() != parameter:
+            self._volume_control.connect_to(parameter)
+
+    def _volume_value(self, value):
+        if self._volume_grouped and self.volume_handler:
+            self.volume_handler(self, value)
 
     def set_device_controls(self, controls):
+        for control in self._device_controls or []:
+            if control and control not in (controls or []):
+                control.release_parameter()
         self._device_controls = controls
-        self._create_device_component()
+        self._connect_device_controls()
 
     def update(self):
-        if self._chain:
-            if self._volume_control:
-                self._volume_control.release_parameter()
-                self._volume_control.connect_to(self._chain.mixer_device.volume)
-            self._update_device_component()
-
-    def _create_device_component(self):
-        if self._device:
-            self._device_component = DeviceComponent(
-                device_selection_follows_track_selection=False
-            )
-            self._update_device_component()
-        else:
-            self._device_component = None
+        self._connect_volume_control()
+        self._connect_device_controls()
+
+    # connects the device controls straight to the device's resolved
+    # parameters, leaving controls alone that are already connected to
+    # the right one so their MIDI mappings aren't rebuilt
+    @timed("DrumChainStripComponent._connect_device_controls")
+    def _connect_device_controls(self):
+        parameters = self._device_parameters.parameters if self._device_parameters else ()
+        for index, control in enumerate(self._device_controls or []):
+            if not control:
+                continue
+            parameter = parameters[index] if index < len(parameters) else None
+            if parameter is None:
+                control.release_parameter()
+            elif control.mapped_parameter() != parameter:
+                control.connect_to(parameter)
 
-    def _update_device_component(self):
-        if self._device_component:
-            self._device_component.set_lock_to_device(True, self._device)
-            self._device_component.set_parameter_controls(self._device_controls)
-            self._device_component.set_enabled(True)
+    def _release_device_controls(self):
+        for control in self._device_controls or []:
+            if control:
+                control.release_parameter()
+
+    # the volume and the parameters the device controls are mapped to
+    def snapshot_parameters(self):
+        if not self._chain:
+            return None, []
+        parameters = [control.mapped_parameter() for control in self._device_controls or [] if control]
+        return self._chain.mixer_device.volume, [parameter for parameter in parameters if parameter is not None]
 
     def _select_value(self, value):
+        if self.button_filter and self.button_filter(self, "select", value):
+            return
         if self._chain != None and self._device:
             app = Live.Application.get_application()
             app.view.show_view('Detail')
@@ -125,9 +270,18 @@ class DrumChainStripComponent(ControlSurfaceComponent):
                 self.song().view.selected_track = track
                 drum_rack.view.selected_chain = self._chain
 
-    def _mute_value(self, value):
-        if self._chain and value:
+    def _state_value(self, value):
+        if self.button_filter and self.button_filter(self, "state", value):
+            return
+        if not self._chain or not value:
+            return
+
+        if self._state_mode == "mute":
             self._chain.mute = not self._chain.mute
+        elif self._state_mode == "solo":
+            self._chain.solo = not self._chain.solo
+        elif self.arm_handler:
+            self.arm_handler(self)
 
     def _get_track_of_device(self, device):
         parent = device.canonical_parent
@@ -143,190 +297,620 @@ class DrumChainStripComponent(ControlSurfaceComponent):
 
         self._select_button = button
         self._select_button_slot.subject = button
+        self.update_selected_lights()
 
-    def set_mute_button(self, button):
-        if button != None:
-            button.reset()
+    # the same buttons are handed over from mode to mode. Only a button
+    # the strip didn't light before is reset, otherwise just the colors
+    # that differ between the modes are sent. Releasing the buttons of a
+    # mode that was already left is ignored
+    def set_state_button(self, button, mode):
+        if button is None and mode != self._state_mode:
+            return
 
-        self._mute_button = button
-        self._mute_button_slot.subject = button
+        if button is not None and button is not self._shown_state_button:
+            button.reset()
+            self._shown_state_button = button
+            self._shown_state_color = None
 
-    def _get_all_controls(self):
-        return self._volume_controls + self._pan_controls + self._send_controls
+        self._state_button = button
+        self._state_mode = mode
+        self._state_button_slot.subject = button
+        self.update_state_lights()
 
     def disconnect(self):
         if self._volume_control:
             self._volume_control.release_parameter()
-        if self._device_component:
-            self._device_component.disconnect()
-        if self._chain:
-            self._chain.remove_devices_listener(self._on_devices_changed)
-            if hasattr(self._chain, 'canonical_parent') and self._chain.canonical_parent:
-                self._chain.canonical_parent.view.remove_selected_drum_pad_listener(self._on_selected_drum_pad_changed)
+        self._release_device_controls()
+        self._on_device_parameters_changed.subject = None
+        self._device_parameter_cache.unpin(self._device_parameters)
+        self._on_device_target_changed.subject = None
+        self._device_target_cache.unpin(self._device_target)
         self._chain = None
+        self._device_target = None
         self._device = None
+        self._device_parameters = None
         self._device_controls = None
-        self._device_component = None
         self._volume_control = None
 
         if self._select_button:
             self._select_button.send_value(0)
         self._select_button = None
+        self._state_button = None
+        self._shown_state_button = None
+        self._state_colors = {}
+        listener_registry.disconnect(self)
         super(DrumChainStripComponent, self).disconnect()
 
+# strip widths of the layouts for 1, 2 and 4 tracks, each segment of
+# strips follows the drum rack of its own track
+LAYOUTS = {
+    1: (8,),
+    2: (4, 4),
+    4: (2, 2, 2, 2),
+}
+
+# a run of strips bound to the drum rack of one track, tracking the rack's
+# populated pads and selected pad. Pad offsets are given for a full width
+# of NUM_STRIPS and scaled to the segment's width, so every segment pages
+# through its own rack at the same rate
+class DrumRackSegment(SlotManager):
+    _track = None
+    _drum_group_device = None
+    _pad_index = None
+    _bank_offset = None
+    _selected_strip_index = None
+
+    def __init__(self, mixer, strips, pad_index_cache, *a, **k):
+        super(DrumRackSegment, self).__init__(*a, **k)
+        self._mixer = mixer
+        self._strips = strips
+        self._pad_index_cache = pad_index_cache
+        self._strip_index_by_note = {}
+        self._prefetched_banks = {}
+
+    @property
+    def strips(self):
+        return self._strips
+
+    @property
+    def width(self):
+        return len(self._strips)
+
+    @property
+    def track(self):
+        return self._track
+
+    @property
+    def drum_group_device(self):
+        return self._drum_group_device
+
+    @property
+    def pad_offset(self):
+        bank_offset = self._mixer.bank_offset if self._bank_offset is None else self._bank_offset
+        return (bank_offset + self._mixer.unit_offset) * self.width // NUM_STRIPS
+
+    @property
+    def bank_size(self):
+        return self._mixer.bank_size * self.width // NUM_STRIPS
+
+    @property
+    def num_pads(self):
+        return len(self._pad_index) if self._pad_index else 0
+
+    # the notes of the pads bound to the strips, None for empty strips
+    def bound_notes(self):
+        notes = dict((index, note) for note, index in self._strip_index_by_note.items())
+        return [notes.get(index) for index in range(self.width)]
+
+    def chain(self, note):
+        return self._pad_index.chain(note) if self._pad_index else None
+
+    # returns whether the segment was rebound, a segment that already
+    # follows this track and rack is left alone
+    def set_track(self, track, drum_group_device):
+        if same_chain(track, self._track) and same_chain(drum_group_device, self._drum_group_device):
+            return False
+
+        self._track = track
+        self._drum_group_device = drum_group_device
+        self._on_track_arm_changed.subject = track if track and track.can_be_armed else None
+        self._on_selected_drum_pad_changed.subject = drum_group_device.view if drum_group_device else None
+        self._pad_index_cache.unpin(self._pad_index)
+        self._pad_index = self._pad_index_cache.get(drum_group_device) if drum_group_device else None
+        self._pad_index_cache.pin(self._pad_index)
+        self._on_pads_changed.subject = self._pad_index
+        self._prefetched_banks = {}
+        return True
+
+    # a segment whose rack was replaced while paged past the end of the
+    # new rack shows the new rack's last bank instead, the other segments
+    # stay on the bank. The next bank change brings it back in line
+    def clamp_bank(self, bank_offset):
+        self._bank_offset = None
+        if bank_offset is None:
+            return
+        offset = bank_offset
+        while offset > 0 and not self.has_pads_after(offset):
+            offset = max(0, offset - self._mixer.bank_size)
+        if offset != bank_offset:
+            self._bank_offset = offset
+
+    @subject_slot("pads")
+    def _on_pads_changed(self):
+        self._prefetched_banks = {}
+        self._mixer._update_strip_chains([self])
+
+    # binds the populated pads from the offset on to the strips, only
+    # touching the strips whose chain was added, removed, replaced or moved
+    def update_strip_chains(self):
+        chains = self._prefetched_banks.get(self.pad_offset)
+        if chains is None:
+            chains = self._pad_index.chains(self.pad_offset, self.width) if self._pad_index else []
+            chains += [None] * (self.width - len(chains))
+
+        for strip, chain in zip(self._strips, chains):
+            strip.set_chain(chain)
+
+        notes = self._pad_index.notes(self.pad_offset, self.width) if self._pad_index else []
+        self._strip_index_by_note = dict((note, index) for index, note in enumerate(notes))
+        self._selected_strip_index = self._find_selected_strip_index()
+        armed = self._is_track_armed()
+        for index, strip in enumerate(self._strips):
+            strip.set_selected(index == self._selected_strip_index)
+            strip.set_track_armed(armed)
+        self._prefetched_banks = {}
+
+    def _find_selected_strip_index(self):
+        if not self._drum_group_device:
+            return None
+        selected_drum_pad = self._drum_group_device.view.selected_drum_pad
+        if not selected_drum_pad:
+            return None
+        return self._strip_index_by_note.get(selected_drum_pad.note)
+
+    # one listener for the whole rack, only the lights of the previously
+    # and newly selected strips are repainted
+    @listens("selected_drum_pad")
+    def _on_selected_drum_pad_changed(self):
+        index = self._find_selected_strip_index()
+        if index == self._selected_strip_index:
+            return
+
+        if self._selected_strip_index is not None:
+            self._strips[self._selected_strip_index].set_selected(False)
+        if index is not None:
+            self._strips[index].set_selected(True)
+        self._selected_strip_index = index
+
+    def _is_track_armed(self):
+        track = self._on_track_arm_changed.subject
+        return bool(track and track.arm)
+
+    @listens("arm")
+    def _on_track_arm_changed(self):
+        armed = self._is_track_armed()
+        for strip in self._strips:
+            strip.set_track_armed(armed)
+
+    # arms the track with the strip's pad selected, so the pad is the one
+    # being played and recorded. Pressing the armed pad again disarms
+    def arm_pad(self, strip):
+        track = self._on_track_arm_changed.subject
+        note = self.bound_notes()[self._strips.index(strip)]
+        if not track or note is None:
+            return
+
+        if track.arm and self._selected_strip_index == self._strips.index(strip):
+            track.arm = False
+            return
+
+        self._drum_group_device.view.selected_drum_pad = self._drum_group_device.drum_pads[note]
+        track.arm = True
+
+    # reads the chains of the banks around the current one, so paging to
+    # them is only a rebind of the strips
+    def prefetch_banks(self):
+        if not self._pad_index:
+            return
+
+        for offset in (self.pad_offset - self.bank_size, self.pad_offset + self.bank_size):
+            if 0 <= offset < len(self._pad_index) and offset not in self._prefetched_banks:
+                chains = self._pad_index.chains(offset, self.width)
+                self._prefetched_banks[offset] = chains + [None] * (self.width - len(chains))
+
+    # whether a bank starting at bank_offset has any pads for the group of
+    # units, regardless of the unit offset, so every unit of the group
+    # agrees on paging and they page together
+    def has_pads_after(self, bank_offset):
+        return bank_offset * self.width // NUM_STRIPS < self.num_pads
+
+    def disconnect(self):
+        self._track = None
+        self._drum_group_device = None
+        self._pad_index_cache.unpin(self._pad_index)
+        self._pad_index = None
+        self._strips = []
+        self._strip_index_by_note = {}
+        self._prefetched_banks = {}
+        listener_registry.disconnect(self)
+        super(DrumRackSegment, self).disconnect()
+
 class DrumGroupMixerComponent(ControlSurfaceComponent):
     _session = None
-    _drum_group_device = None
+    _bank_offset = 0
+    _unit_offset = 0
+    _bank_size = NUM_STRIPS
 
-    _volume_controls = []
-    _device_controls = []
     _drum_strips = []
+    _segments = []
 
     _arm_button_slot = None
     _arm_button = None
+    _bank_up_button = None
+    _bank_down_button = None
+
+    on_bank_changed = None
+    on_bank_buttons_combo = None
+    on_shifted_bank_buttons_combo = None
+    on_shifted_strip_button = None
+    bank_selector = None
 
-    def __init__(self, *a, **k):
+    def __init__(self, pad_index_cache=None, num_tracks=1, device_parameter_cache=None, layouts=LAYOUTS, device_target_cache=None, *a, **k):
         super(DrumGroupMixerComponent, self).__init__(*a, **k)
 
         def make_button_slot(name):
             return self.register_slot(None, getattr(self, "_%s_value" % name), "value")
 
         self._arm_button_slot = make_button_slot("arm")
+        self._bank_up_button_slot = make_button_slot("bank_up")
+        self._bank_down_button_slot = make_button_slot("bank_down")
+        self._bank_buttons = ButtonPair(self._on_bank_buttons_pressed_together)
+        self._prefetch_task = self._tasks.add(Task.run(self._prefetch_banks))
+        self._prefetch_task.kill()
+        self._group_volume_task = self._tasks.add(Task.run(self._apply_group_volume))
+        self._group_volume_task.kill()
+        self._group_volume_move = None
+        self._group_volume_level = None
+        self._group_volume_strip = None
+        self._pad_index_cache = pad_index_cache or make_pad_index_cache()
+        self._device_parameter_cache = device_parameter_cache or DeviceParameterCache()
+        self._device_target_cache = device_target_cache or DeviceTargetCache()
+        self._drum_strips = [DrumChainStripComponent(self._device_parameter_cache, self._device_target_cache) for _ in range(NUM_STRIPS)]
+        for strip in self._drum_strips:
+            strip.button_filter = self._filter_strip_button
+            strip.arm_handler = self._arm_pad
+            strip.volume_handler = self._group_volume_value
+        self._arm_button_used_as_shift = False
+        self._strips_created = len(self._drum_strips)
+        self._strips_reused = 0
+        self._segments = []
+        self._layouts = layouts
+        self.set_num_tracks(num_tracks)
 
     def set_volume_controls(self, controls):
-        self._release_controls(self._volume_controls)
-        self._volume_controls = controls
-        self.update()
+        controls = list(controls) if controls else [None] * NUM_STRIPS
+        for strip, control in zip(self._drum_strips, controls):
+            strip.set_volume_control(control)
 
+    # one row of controls per parameter, as many rows as were configured
+    @timed("DrumGroupMixerComponent.set_device_controls")
     def set_device_controls(self, controls):
-        self._release_controls(self._device_controls)
-
-        if not self._drum_group_device:
-            return
-
-        controls_by_device = [[None, None, None] for _ in range(8)]
+        controls = list(controls) if controls else []
+        controls_by_strip = [[None] * (len(controls) // NUM_STRIPS) for _ in range(NUM_STRIPS)]
 
         for index, control in enumerate(controls):
-            controls_by_device[index%8][index//8] = controls[index]
+            controls_by_strip[index % NUM_STRIPS][index // NUM_STRIPS] = control
 
-        drum_pads = self._drum_group_device.drum_pads
-        drum_pads = sorted(drum_pads, key=lambda pad: pad.note)
+        for strip, device_controls in zip(self._drum_strips, controls_by_strip):
+            strip.set_device_controls(device_controls)
 
-        chains_in_note_order = []
+    # the device the encoders of a strip bound to the chain would control
+    def target_device(self, chain):
+        return self._device_target_cache.device(chain) if chain is not None else None
 
-        for pad in drum_pads:
-            if pad.chains and len(pad.chains) > 0:
-                chains_in_note_order.append(pad.chains[0])
+    @property
+    def segments(self):
+        return self._segments
 
-        self._drum_strips = []
-        for drum_chain in chains_in_note_order[:8]:
-            drum_strip = DrumChainStripComponent()
-            drum_strip.set_chain(drum_chain)
-            self._drum_strips.append(drum_strip)
+    @property
+    def num_tracks(self):
+        return len(self._segments)
 
-        for device_controls, volume_control, device in zip(controls_by_device, self._volume_controls, self._drum_strips):
-            device.set_device_controls(device_controls)
-            device.set_volume_control(volume_control)
+    # splits the strips into one segment per track following the layout,
+    # the strips keep their chains until the new segments are bound
+    def set_num_tracks(self, num_tracks):
+        widths = self._layouts[num_tracks]
+        if [segment.width for segment in self._segments] == list(widths):
+            return
 
-        self.update()
+        for segment in self._segments:
+            segment.disconnect()
+        self._segments = []
+        start = 0
+        for width in widths:
+            self._segments.append(DrumRackSegment(self, self._drum_strips[start:start + width], self._pad_index_cache))
+            start += width
 
     def set_session(self, session):
         self._session = session
-        first_track = session.current_tracks[0]
-        self._drum_group_device = self._find_drum_group_device(first_track)
 
-        if self._drum_group_device:
-            self._drum_group_device.canonical_parent.add_arm_listener(self._on_arm_changed)
+    # called again on every track switch with the bank to start from, and
+    # without one when the rack of a followed track changed. Only the
+    # segments whose track or rack changed are rebound, their strips are
+    # kept and rebound to the new rack in place
+    def set_tracks(self, tracks, drum_group_devices, bank_offset=None):
+        changed = []
+        for segment, track, drum_group_device in zip(self._segments, tracks, drum_group_devices):
+            if segment.set_track(track, drum_group_device):
+                self._strips_reused += segment.width
+                changed.append(segment)
+        self._on_arm_changed.subject = self._arm_track()
+        if bank_offset is not None:
+            self.set_bank_offset(bank_offset)
+        else:
+            for segment in changed:
+                segment.clamp_bank(self._bank_offset)
+            if changed:
+                self._update_strip_chains(changed)
+        self._on_arm_changed()
+
+    def allocation_stats(self):
+        return {
+            "strips_created": self._strips_created,
+            "strips_reused": self._strips_reused,
+            "device_parameters_cached": self._device_parameter_cache.hits,
+            "device_parameters_resolved": self._device_parameter_cache.resolved,
+            "device_targets_cached": self._device_target_cache.hits,
+            "device_targets_resolved": self._device_target_cache.resolved,
+        }
+
+    @property
+    def bank_offset(self):
+        return self._bank_offset
+
+    @property
+    def unit_offset(self):
+        return self._unit_offset
+
+    @property
+    def bank_size(self):
+        return self._bank_size
+
+    # the first strip of each segment is bound to the populated pad, in
+    # note order, at the bank offset plus the unit offset. When several
+    # units share a rack each gets its own unit offset and the bank size
+    # spans all of them
+    def set_unit_offset(self, unit_offset, bank_size=NUM_STRIPS):
+        self._unit_offset = max(0, unit_offset)
+        self._bank_size = max(NUM_STRIPS, bank_size)
+        self._update_strip_chains()
+
+    def set_bank_offset(self, offset):
+        self._bank_offset = max(0, offset)
+        for segment in self._segments:
+            segment.clamp_bank(None)
+        self._update_strip_chains()
+
+    @timed("DrumGroupMixerComponent._update_strip_chains")
+    def _update_strip_chains(self, segments=None):
+        for segment in segments or self._segments:
+            segment.update_strip_chains()
+
+        self._update_bank_lights()
+        self._prefetch_task.kill()
+        self._prefetch_task = self._tasks.add(Task.run(self._prefetch_banks))
+
+    # reads the chains of the banks around the current ones in the
+    # background, so paging to them is only a rebind of the strips
+    def _prefetch_banks(self):
+        for segment in self._segments:
+            segment.prefetch_banks()
+
+    # the racks are about to be left, don't spend time on their other banks
+    def cancel_prefetch(self):
+        self._prefetch_task.kill()
+
+    def _can_bank_up(self):
+        return any(segment.has_pads_after(self._bank_offset + self._bank_size) for segment in self._segments)
+
+    def _can_bank_down(self):
+        return self._bank_offset > 0
+
+    @timed("DrumGroupMixerComponent._update_bank_lights")
+    def _update_bank_lights(self):
+        if self._bank_up_button:
+            self._bank_up_button.send_value(Colors.DrumGroup.BankAvailable if self._can_bank_up() else Colors.DrumGroup.BankUnavailable)
+        if self._bank_down_button:
+            self._bank_down_button.send_value(Colors.DrumGroup.BankAvailable if self._can_bank_down() else Colors.DrumGroup.BankUnavailable)
+
+    def set_bank_up_button(self, button):
+        self._bank_up_button = button
+        self._bank_up_button_slot.subject = button
+        self._update_bank_lights()
+
+    def set_bank_down_button(self, button):
+        self._bank_down_button = button
+        self._bank_down_button_slot.subject = button
+        self._update_bank_lights()
+
+    # banks change when a button is released, so pressing both together
+    # can be used as a combination without paging
+    def _bank_up_value(self, value):
+        if self._bank_buttons.released("up", value) and self._can_bank_up():
+            self._select_bank(self._bank_offset + self._bank_size)
+
+    def _bank_down_value(self, value):
+        if self._bank_buttons.released("down", value) and self._can_bank_down():
+            self._select_bank(max(0, self._bank_offset - self._bank_size))
+
+    # with the arm button held the combination is a shifted one
+    def _on_bank_buttons_pressed_together(self):
+        if self._arm_button and self._arm_button.is_pressed():
+            self._arm_button_used_as_shift = True
+            if self.on_shifted_bank_buttons_combo:
+                self.on_shifted_bank_buttons_combo()
+        elif self.on_bank_buttons_combo:
+            self.on_bank_buttons_combo()
+
+    def _select_bank(self, offset):
+        if self.bank_selector:
+            self.bank_selector(offset)
+        else:
+            self.set_bank_offset(offset)
+        if self.on_bank_changed:
+            self.on_bank_changed()
+
+    # the arm button arms the track of the first segment
+    def _arm_track(self):
+        track = self._segments[0].track if self._segments else None
+        return track if track and track.can_be_armed else None
 
+    def _has_drum_group_device(self):
+        return any(segment.drum_group_device for segment in self._segments)
+
+    @listens("arm")
     def _on_arm_changed(self):
-        if not self._drum_group_device or not self._arm_button:
+        if not self._arm_button:
             return
 
-        if not self._session:
+        track = self._on_arm_changed.subject
+        if not self._segments or not self._segments[0].drum_group_device or not track:
+            self._arm_button.send_value(Colors.DrumGroup.ArmUnselected)
             return
 
-        if self._drum_group_device.canonical_parent.arm:
-            self._arm_button.send_value(Color(127))
+        if track.arm:
+            self._arm_button.turn_on()
         else:
-            self._arm_button.send_value(Color(0))
+            self._arm_button.turn_off()
 
     def update(self):
         super(DrumGroupMixerComponent, self).update()
 
-    def _find_drum_group_device(self, track_or_chain):
-        instrument = find_if((lambda d: d.type == Live.Device.DeviceType.instrument), track_or_chain.devices)
-        if instrument:
-            if instrument.can_have_drum_pads:
-                return instrument
-            if instrument.can_have_chains:
-                return find_if(bool, map(_find_drum_group_device, instrument.chains))
-
     def set_pad_select_buttons(self, buttons):
-        if not self._drum_group_device:
-            return
-
-        for strip, button in zip_longest(self._drum_strips, buttons or []):
+        buttons = list(buttons) if buttons else [None] * NUM_STRIPS
+        for strip, button in zip(self._drum_strips, buttons):
             if button:
                 button.set_on_off_values("DrumGroup.PadSelected", "DrumGroup.PadUnselected")
             strip.set_select_button(button)
 
     def set_mute_buttons(self, buttons):
-        if not self._drum_group_device:
-            return
+        self._set_state_buttons(buttons, "mute")
 
-        for strip, button in zip_longest(self._drum_strips, buttons or []):
-            if button:
-                button.set_on_off_values("DrumGroup.MuteOn", "DrumGroup.MuteOff")
-            strip.set_mute_button(button)
+    def set_solo_buttons(self, buttons):
+        self._set_state_buttons(buttons, "solo")
 
-    def _release_controls(self, controls ):
-         for control in controls:
-            if control:
-                control.release_parameter()
+    def set_arm_buttons(self, buttons):
+        self._set_state_buttons(buttons, "arm")
+
+    # the modes share the state buttons, the strips send the colors they
+    # send themselves, so on/off values aren't set on the buttons
+    def _set_state_buttons(self, buttons, mode):
+        buttons = list(buttons) if buttons else [None] * NUM_STRIPS
+        for strip, button in zip(self._drum_strips, buttons):
+            strip.set_state_button(button, mode)
 
-    def _get_all_controls(self):
-        controls = self._device_controls
-        if self._volume_controls:
-            controls.extend(self._volume_controls)
-        return controls
+    def _arm_pad(self, strip):
+        for segment in self._segments:
+            if strip in segment.strips:
+                segment.arm_pad(strip)
 
+    @timed("DrumGroupMixerComponent.update_selected_lights")
     def update_selected_lights(self):
-        if not self._drum_group_device or not self._drum_strips:
+        if not self._has_drum_group_device() or not self._drum_strips:
             return
 
         for drum_strip in self._drum_strips:
             drum_strip.update_selected_lights()
 
-    def update_mute_lights(self):
-        if not self._drum_group_device or not self._drum_strips:
+    @timed("DrumGroupMixerComponent.update_state_lights")
+    def update_state_lights(self):
+        if not self._has_drum_group_device() or not self._drum_strips:
             return
 
         for drum_strip in self._drum_strips:
-            drum_strip.update_mute_lights()
+            drum_strip.update_state_lights()
 
     def set_arm_button(self, button):
-        if not self._drum_group_device or not self._arm_button_slot:
-            return
-
         self._arm_button = button
         self._arm_button_slot.subject = button
-        self._arm_button.set_on_off_values("DrumGroup.ArmSelected", "DrumGroup.ArmUnselected")
+        if self._arm_button:
+            self._arm_button.set_on_off_values("DrumGroup.ArmSelected", "DrumGroup.ArmUnselected")
+        self._on_arm_changed()
 
+    # the arm button doubles as shift for the strip buttons and turns the
+    # faders into group volume faders while held, so arming happens on
+    # release and only when no strip button was pressed or fader moved
     def _arm_value(self, value):
-        if not self._drum_group_device or not self._arm_button:
+        if value:
+            self._arm_button_used_as_shift = False
+            self._set_volume_grouped(True)
+            return
+        self._set_volume_grouped(False)
+        if self._arm_button_used_as_shift:
             return
 
-        if value != 0:
-            self._drum_group_device.canonical_parent.arm = not self._drum_group_device.canonical_parent.arm
+        track = self._on_arm_changed.subject
+        if self._segments and self._segments[0].drum_group_device and track:
+            track.arm = not track.arm
+
+    # the faders are released from their pads once per press, so the
+    # MIDI map is only rebuilt when the button goes down and up
+    def _set_volume_grouped(self, grouped):
+        if not grouped:
+            self._finish_group_volume()
+        for strip in self._drum_strips:
+            strip.set_volume_grouped(grouped)
+
+    # while the arm button is held any fader moves the volumes of all
+    # bound pads of the unit by the same number of dB, its own pad
+    # included. The fader's first value is taken as where the group is,
+    # so nothing jumps when it's touched, and the group follows how far
+    # the fader moved from there. The level is only taken here, the whole
+    # group is computed and written once per tick
+    def _group_volume_value(self, strip, value):
+        self._arm_button_used_as_shift = True
+        level = volume_to_db(value / 127.0)
+        if strip is not self._group_volume_strip:
+            self._finish_group_volume()
+            self._group_volume_strip = strip
+            self._group_volume_move = GroupVolumeMove(
+                [drum_strip.chain.mixer_device.volume for drum_strip in self._drum_strips if drum_strip.chain], level)
+        self._group_volume_level = level
+        if self._group_volume_task.is_killed:
+            self._group_volume_task = self._tasks.add(Task.run(self._apply_group_volume))
+
+    @timed("DrumGroupMixerComponent._apply_group_volume")
+    def _apply_group_volume(self):
+        if self._group_volume_move and self._group_volume_level is not None:
+            self._group_volume_move.apply(self._group_volume_level)
+            self._group_volume_level = None
+
+    def _finish_group_volume(self):
+        self._group_volume_task.kill()
+        self._apply_group_volume()
+        self._group_volume_move = None
+        self._group_volume_strip = None
+
+    def _filter_strip_button(self, strip, name, value):
+        if not self._arm_button or not self._arm_button.is_pressed():
+            return False
+        self._arm_button_used_as_shift = True
+        if value and self.on_shifted_strip_button:
+            self.on_shifted_strip_button(name, self._drum_strips.index(strip))
+        return True
 
     def disconnect(self):
-        self._release_controls(self._get_all_controls())
+        for segment in self._segments:
+            segment.disconnect()
         if self._drum_strips:
             for strip in self._drum_strips:
                 strip.disconnect()
-        self._drum_group_device = None
-        self._drum_strips = None
-        self._volume_controls = None
-        self._pan_controls = None
-        self._send_controls = None
+        self._prefetch_task.kill()
+        self._group_volume_task.kill()
+        self._group_volume_move = None
+        self._group_volume_strip = None
+        self._segments = []
+        self._drum_strips = []
         self._session = None
+        listener_registry.disconnect(self)
+        super(DrumGroupMixerComponent, self).disconnect()
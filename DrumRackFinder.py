@@ -0,0 +1,95 @@
+import Live
+
+from .ListenerRegistry import listener_registry, listens_group
+from .MruCache import MruCache
+
+import logging
+logger = logging.getLogger(__name__)
+
+DRUM_RACK_CACHE_SIZE = 32
+
+def is_instrument(device):
+    return device.type == Live.Device.DeviceType.instrument
+
+# depth first search for the first drum rack of a track or chain, going
+# into the chains of instrument racks. Every track or chain whose devices
+# were looked at and every rack whose chains were looked at is passed to
+# visit, as a change to any of them can change the result
+def find_drum_group_device(track_or_chain, visit=None):
+    if visit:
+        visit(track_or_chain, "devices")
+
+    for device in track_or_chain.devices:
+        if not is_instrument(device):
+            continue
+        if device.can_have_drum_pads:
+            return device
+        if device.can_have_chains:
+            if visit:
+                visit(device, "chains")
+            for chain in device.chains:
+                drum_group_device = find_drum_group_device(chain, visit)
+                if drum_group_device:
+                    return drum_group_device
+    return None
+
+# the result of a search for one track, along with the listeners on
+# everything the search walked through that throw the result away
+class DrumRackSearch(object):
+
+    def __init__(self, finder, track):
+        self._finder = finder
+        self.track = track
+        self.drum_group_device = None
+        self._search()
+
+    def _search(self):
+        visited = {"devices": [], "chains": []}
+        self.drum_group_device = find_drum_group_device(self.track, lambda subject, event: visited[event].append(subject))
+        self._on_devices_changed.replace_subjects(visited["devices"])
+        self._on_chains_changed.replace_subjects(visited["chains"])
+
+    @listens_group("devices")
+    def _on_devices_changed(self, subject):
+        self._finder._invalidate(self)
+
+    @listens_group("chains")
+    def _on_chains_changed(self, subject):
+        self._finder._invalidate(self)
+
+    def disconnect(self):
+        listener_registry.disconnect(self)
+        self.track = None
+        self.drum_group_device = None
+
+# caches the drum rack found on recently used tracks, so coming back to a
+# track or searching again after an unrelated device change doesn't walk
+# the device tree. on_invalidated is called with the track whose result
+# was thrown away because a device or chain along its search changed
+class DrumRackFinder(object):
+
+    def __init__(self, on_invalidated=None, size=DRUM_RACK_CACHE_SIZE):
+        self._on_invalidated = on_invalidated
+        self._cache = MruCache(lambda track: DrumRackSearch(self, track), lambda search: search.track, size, "drum rack search")
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    def find(self, track):
+        if track is None:
+            return None
+        return self._cache.get(track).drum_group_device
+
+    def _invalidate(self, search):
+        track = search.track
+        self._cache.remove(search)
+        if self._on_invalidated and track != None:
+            self._on_invalidated(track)
+
+    def disconnect(self):
+        self._cache.disconnect()
@@ -0,0 +1,56 @@
+import math
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Live's volume parameters are about linear in dB from -18 dB at 0.4 over
+# 0 dB at 0.85 to +6 dB at 1, and fall off to -inf dB at 0 below that
+VOLUME_KNEE = 0.4
+VOLUME_KNEE_DB = -18.0
+VOLUME_UNITY = 0.85
+DB_PER_VOLUME = 40.0
+MIN_DB = -70.0
+
+# volume changes smaller than this are not written
+MIN_VOLUME_CHANGE = 0.0005
+
+def volume_to_db(value):
+    if value >= VOLUME_KNEE:
+        return (value - VOLUME_UNITY) * DB_PER_VOLUME
+    if value <= 0.0:
+        return MIN_DB
+    return max(MIN_DB, VOLUME_KNEE_DB + DB_PER_VOLUME * math.log10(value / VOLUME_KNEE))
+
+def db_to_volume(db):
+    if db >= VOLUME_KNEE_DB:
+        return VOLUME_UNITY + db / DB_PER_VOLUME
+    if db <= MIN_DB:
+        return 0.0
+    return VOLUME_KNEE * 10.0 ** ((db - VOLUME_KNEE_DB) / DB_PER_VOLUME)
+
+# moves the volumes of a group of pads by the same number of dB, keeping
+# their balance. The volumes are taken when the move starts and every new
+# group level is applied to those, so pads pushed against the top or the
+# bottom of their range get their place back when the level comes back.
+# Silent pads stay silent. The reference is the level in dB the move
+# starts from, every level is applied as an offset from it
+class GroupVolumeMove(object):
+
+    def __init__(self, parameters, reference_db):
+        self._parameters = list(parameters)
+        self._start_dbs = [volume_to_db(parameter.value) if parameter.value > 0.0 else None
+                           for parameter in self._parameters]
+        self._reference_db = reference_db
+
+    def values_at(self, level_db):
+        offset = level_db - self._reference_db
+        return [0.0 if start_db is None else
+                max(parameter.min, min(parameter.max, db_to_volume(start_db + offset)))
+                for parameter, start_db in zip(self._parameters, self._start_dbs)]
+
+    # computes the whole group for the level first, then writes what changed
+    def apply(self, level_db):
+        values = self.values_at(level_db)
+        for parameter, value in zip(self._parameters, values):
+            if parameter != None and abs(parameter.value - value) >= MIN_VOLUME_CHANGE:
+                parameter.value = value
@@ -0,0 +1,75 @@
+from itertools import chain
+
+from .Profiler import timed
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Launch Control XL "set LEDs" sysex, followed by the template number,
+# any number of (LED index, value) pairs and the sysex terminator
+SET_LEDS_SYSEX_PREFIX = (240, 0, 32, 41, 2, 17, 120)
+SYSEX_END = 247
+MAX_LEDS_PER_MESSAGE = 48
+
+# holds what the hardware currently shows for every LED of one surface,
+# drops writes that wouldn't change anything and sends whatever changed
+# in as few multi-LED sysex messages as possible when flushed
+class LedBuffer(object):
+
+    def __init__(self, send_midi, template):
+        self._send_midi = send_midi
+        self._template = template
+        self._shown = {}
+        self._pending = {}
+
+        self.messages_sent = 0
+        self.leds_sent = 0
+        self.writes_skipped = 0
+        self.writes_coalesced = 0
+
+    def write(self, index, value, force=False):
+        if index in self._pending:
+            if self._pending[index] == value:
+                self.writes_skipped += 1
+                return
+            self.writes_coalesced += 1
+            if not force and self._shown.get(index) == value:
+                del self._pending[index]
+                return
+        elif not force and self._shown.get(index) == value:
+            self.writes_skipped += 1
+            return
+
+        self._pending[index] = value
+
+    # forgets what the hardware shows, so the next flush sends every LED
+    # again. Writes still pending win over what was shown
+    def invalidate(self):
+        shown = self._shown
+        self._shown = {}
+        shown.update(self._pending)
+        self._pending = shown
+
+    @timed("LedBuffer.flush")
+    def flush(self):
+        if not self._pending:
+            return
+
+        leds = sorted(self._pending.items())
+        self._pending = {}
+
+        for start in range(0, len(leds), MAX_LEDS_PER_MESSAGE):
+            pairs = leds[start:start + MAX_LEDS_PER_MESSAGE]
+            self._send_midi(SET_LEDS_SYSEX_PREFIX + (self._template,) + tuple(chain.from_iterable(pairs)) + (SYSEX_END,))
+            self.messages_sent += 1
+
+        self._shown.update(leds)
+        self.leds_sent += len(leds)
+
+    def stats(self):
+        return {
+            "messages_sent": self.messages_sent,
+            "leds_sent": self.leds_sent,
+            "writes_skipped": self.writes_skipped,
+            "writes_coalesced": self.writes_coalesced,
+        }
@@ -0,0 +1,171 @@
+from collections import defaultdict
+
+from .Trace import tracer
+
+import logging
+logger = logging.getLogger(__name__)
+
+# one Live listener, connected to whatever its subject is set to, much
+# like a _Framework subject slot but owned and counted by the registry
+class ListenerSlot(object):
+
+    def __init__(self, registry, owner, event, listener):
+        self._registry = registry
+        self._owner = owner
+        self._event = event
+        self._listener = listener
+        self._subject = None
+
+    @property
+    def event(self):
+        return self._event
+
+    def _get_subject(self):
+        return self._subject
+
+    def _set_subject(self, subject):
+        if subject is self._subject:
+            return
+        self._disconnect_subject()
+        if subject is not None:
+            getattr(subject, "add_%s_listener" % self._event)(self._notify)
+            self._subject = subject
+            self._registry._connected(self)
+
+    subject = property(_get_subject, _set_subject)
+
+    @property
+    def is_stale(self):
+        return self._subject is not None and self._subject == None
+
+    def _disconnect_subject(self):
+        if self._subject is None:
+            return
+        subject = self._subject
+        self._subject = None
+        self._registry._disconnected(self)
+        if subject != None and getattr(subject, "%s_has_listener" % self._event)(self._notify):
+            getattr(subject, "remove_%s_listener" % self._event)(self._notify)
+
+    def _notify(self):
+        self._registry._fired(self)
+        self._listener()
+
+    def __call__(self):
+        return self._listener()
+
+    def disconnect(self):
+        self._disconnect_subject()
+
+# a group of listeners for the same event on many subjects, the listener
+# is called with the subject that changed
+class ListenerSlotGroup(object):
+
+    def __init__(self, registry, owner, event, listener):
+        self._registry = registry
+        self._owner = owner
+        self._event = event
+        self._listener = listener
+        self._slots = []
+
+    def replace_subjects(self, subjects):
+        self.disconnect()
+        for subject in subjects:
+            slot = ListenerSlot(self._registry, self._owner, self._event, lambda subject=subject: self._listener(subject))
+            slot.subject = subject
+            self._slots.append(slot)
+
+    def disconnect(self):
+        for slot in self._slots:
+            slot.disconnect()
+        self._slots = []
+
+# every Live listener of the script goes through here, so all of an
+# owner's listeners can be removed in one go when it disconnects and the
+# number of live subscriptions per subject and event can be inspected
+class ListenerRegistry(object):
+
+    def __init__(self):
+        self._slots_by_owner = defaultdict(list)
+        self._connected_slots = set()
+        self._subscriptions_by_event = defaultdict(int)
+        self._notifications_by_event = defaultdict(int)
+
+    def slot(self, owner, event, listener):
+        slot = ListenerSlot(self, owner, event, listener)
+        self._slots_by_owner[id(owner)].append(slot)
+        return slot
+
+    def slot_group(self, owner, event, listener):
+        group = ListenerSlotGroup(self, owner, event, listener)
+        self._slots_by_owner[id(owner)].append(group)
+        return group
+
+    def disconnect(self, owner):
+        for slot in self._slots_by_owner.pop(id(owner), []):
+            slot.disconnect()
+
+    def _connected(self, slot):
+        self._connected_slots.add(slot)
+        self._subscriptions_by_event[slot.event] += 1
+
+    def _disconnected(self, slot):
+        self._connected_slots.discard(slot)
+        self._subscriptions_by_event[slot.event] -= 1
+
+    def _fired(self, slot):
+        self._notifications_by_event[slot.event] += 1
+        if tracer.recording:
+            tracer.listener(slot.event, slot.subject)
+
+    @property
+    def subscription_count(self):
+        return len(self._connected_slots)
+
+    def subscriptions_by_event(self):
+        return dict((event, count) for event, count in self._subscriptions_by_event.items() if count)
+
+    def notifications_by_event(self):
+        return dict(self._notifications_by_event)
+
+    def subscriptions_by_subject(self):
+        counts = defaultdict(int)
+        for slot in self._connected_slots:
+            subject = slot.subject
+            counts["%s %s" % (type(subject).__name__, getattr(subject, "name", ""))] += 1
+        return dict(counts)
+
+    def stale_count(self):
+        return len([slot for slot in self._connected_slots if slot.is_stale])
+
+    def log_stats(self):
+        logger.info("Listeners: %d subscriptions, %d on deleted subjects, by event %r, notifications %r" % (
+            self.subscription_count, self.stale_count(), self.subscriptions_by_event(), self.notifications_by_event()))
+
+class _ListenerDescriptor(object):
+
+    def __init__(self, func, event, factory):
+        self._func = func
+        self._event = event
+        self._factory = factory
+        self._attribute = "_listener_slot_%s" % func.__name__
+
+    def __get__(self, owner, cls=None):
+        if owner is None:
+            return self
+        slot = owner.__dict__.get(self._attribute)
+        if slot is None:
+            slot = self._factory(owner, self._event, self._func.__get__(owner, cls))
+            owner.__dict__[self._attribute] = slot
+        return slot
+
+listener_registry = ListenerRegistry()
+
+# decorates a method as a listener for a Live event, used like the
+# _Framework subject_slot decorator by setting the slot's subject.
+# Owners must call listener_registry.disconnect(self) when disconnecting
+def listens(event):
+    return lambda func: _ListenerDescriptor(func, event, listener_registry.slot)
+
+def listens_group(event):
+    return lambda func: _ListenerDescriptor(func, event, listener_registry.slot_group)
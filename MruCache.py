@@ -0,0 +1,107 @@
+import logging
+logger = logging.getLogger(__name__)
+
+# strips of one Launch Control XL
+NUM_STRIPS = 8
+# a cache of what strips are bound to holds an entry for every strip of
+# every unit and this many more that aren't bound, see set_num_units
+STRIP_CACHE_MARGIN = NUM_STRIPS * 2
+STRIP_CACHE_SIZE = NUM_STRIPS + STRIP_CACHE_MARGIN
+
+# a small cache of objects built for Live objects, most recently used
+# first. Live objects are found with == as their Python wrappers can't be
+# hashed, so the cache is a list that's scanned. key returns the Live
+# object an entry was built for, None once it was deleted, create builds
+# the entry for a Live object and entries are disconnected when dropped.
+#
+# Entries something is bound to are pinned and never evicted or dropped,
+# the cache grows past its size while more than that are pinned. Deleted
+# entries are dropped whenever the cache misses
+class MruCache(object):
+
+    def __init__(self, create, key, size, name="entry"):
+        self._create = create
+        self._key = key
+        self._size = size
+        self._name = name
+        self._entries = []
+        self._pins = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def entries(self):
+        return self._entries
+
+    def _get_size(self):
+        return self._size
+
+    def _set_size(self, size):
+        self._size = size
+        self._evict()
+
+    size = property(_get_size, _set_size)
+
+    def set_num_units(self, num_units):
+        self.size = max(1, num_units) * NUM_STRIPS + STRIP_CACHE_MARGIN
+
+    def find(self, obj):
+        for position, entry in enumerate(self._entries):
+            if self._key(entry) == obj:
+                if position:
+                    del self._entries[position]
+                    self._entries.insert(0, entry)
+                return entry
+        return None
+
+    def get(self, obj):
+        entry = self.find(obj)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        self._drop_deleted()
+        entry = self._create(obj)
+        self._entries.insert(0, entry)
+        self._evict()
+        return entry
+
+    def pin(self, entry):
+        if entry is not None:
+            self._pins[id(entry)] = self._pins.get(id(entry), 0) + 1
+
+    def unpin(self, entry):
+        if entry is None or id(entry) not in self._pins:
+            return
+        self._pins[id(entry)] -= 1
+        if not self._pins[id(entry)]:
+            del self._pins[id(entry)]
+
+    def is_pinned(self, entry):
+        return id(entry) in self._pins
+
+    def remove(self, entry):
+        if entry in self._entries:
+            self._entries.remove(entry)
+        self._pins.pop(id(entry), None)
+        entry.disconnect()
+
+    def _evict(self):
+        position = len(self._entries) - 1
+        while len(self._entries) > self._size and position >= 0:
+            if not self.is_pinned(self._entries[position]):
+                self._entries.pop(position).disconnect()
+            position -= 1
+
+    def _drop_deleted(self):
+        for entry in [entry for entry in self._entries if self._key(entry) == None and not self.is_pinned(entry)]:
+            logger.debug("Dropping %s of deleted object" % self._name)
+            self._entries.remove(entry)
+            entry.disconnect()
+
+    def disconnect(self):
+        for entry in self._entries:
+            entry.disconnect()
+        self._entries = []
+        self._pins = {}
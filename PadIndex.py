@@ -0,0 +1,81 @@
+from bisect import bisect_left
+
+from _Framework.SubjectSlot import Subject, SlotManager
+
+from .ListenerRegistry import listener_registry, listens, listens_group
+from .MruCache import MruCache
+
+import logging
+logger = logging.getLogger(__name__)
+
+PAD_INDEX_CACHE_SIZE = 8
+
+# the populated pads of a single drum rack in note order, kept up to date
+# through the rack's drum_pads and each pad's chains listeners so binding
+# strips is a slice instead of a sort over all 128 pads
+class PadIndex(SlotManager, Subject):
+    __events__ = ("pads",)
+
+    def __init__(self, drum_group_device, *a, **k):
+        super(PadIndex, self).__init__(*a, **k)
+        self._drum_group_device = drum_group_device
+        self._notes = []
+        self._pads_by_note = {}
+        self._on_drum_pads_changed.subject = drum_group_device
+        self._rebuild()
+
+    @property
+    def drum_group_device(self):
+        return self._drum_group_device
+
+    def __len__(self):
+        return len(self._notes)
+
+    def notes(self, start=0, count=None):
+        return self._notes[start:] if count is None else self._notes[start:start + count]
+
+    def chains(self, start=0, count=None):
+        return [self._pads_by_note[note].chains[0] for note in self.notes(start, count)]
+
+    def chain(self, note):
+        pad = self._pads_by_note.get(note)
+        return pad.chains[0] if pad else None
+
+    def _rebuild(self):
+        drum_pads = self._drum_group_device.drum_pads
+        self._on_pad_chains_changed.replace_subjects(drum_pads)
+        self._pads_by_note = dict((pad.note, pad) for pad in drum_pads if pad.chains)
+        self._notes = sorted(self._pads_by_note)
+
+    @listens("drum_pads")
+    def _on_drum_pads_changed(self):
+        self._rebuild()
+        self.notify_pads()
+
+    @listens_group("chains")
+    def _on_pad_chains_changed(self, pad):
+        note = pad.note
+        position = bisect_left(self._notes, note)
+        indexed = position < len(self._notes) and self._notes[position] == note
+
+        if pad.chains:
+            self._pads_by_note[note] = pad
+            if not indexed:
+                self._notes.insert(position, note)
+        elif indexed:
+            del self._notes[position]
+            del self._pads_by_note[note]
+        self.notify_pads()
+
+    def disconnect(self):
+        self._drum_group_device = None
+        self._notes = []
+        self._pads_by_note = {}
+        listener_registry.disconnect(self)
+        super(PadIndex, self).disconnect()
+
+# keeps the pad indices of recently visited racks alive so that returning
+# to a track doesn't rebuild them, dropping those whose rack was deleted.
+# Segments pin the index of the rack they follow
+def make_pad_index_cache(size=PAD_INDEX_CACHE_SIZE):
+    return MruCache(PadIndex, lambda index: index.drum_group_device, size, "pad index")
@@ -0,0 +1,138 @@
+from functools import wraps
+from glob import glob
+import os
+import sys
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+NUM_BUCKETS = 24
+TIMINGS_FILENAME = "DrumControlXL_timings.txt"
+
+# call count, total and worst time of one timed function, plus a histogram
+# of call times in power of two microsecond buckets, bucket n counting the
+# calls that took less than 2^n microseconds
+class Timer(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * NUM_BUCKETS
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.buckets[min(int(elapsed * 1000000).bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def format(self):
+        lines = ["%s: %d calls, %.3f ms total, %.3f ms mean, %.3f ms max" % (
+            self.name, self.count, self.total * 1000, self.total * 1000 / max(1, self.count), self.max * 1000)]
+        for bucket, count in enumerate(self.buckets):
+            if count:
+                lines.append("  < %8d us %8d %s" % (1 << bucket, count, "#" * max(1, 50 * count // self.count)))
+        return "\n".join(lines)
+
+# Live's Log.txt sits in the preferences folder of the running version,
+# take the most recently written one and fall back to the home folder
+def live_log_directory():
+    if sys.platform == "darwin":
+        patterns = [os.path.expanduser("~/Library/Preferences/Ableton/Live */Log.txt")]
+    elif sys.platform.startswith("win"):
+        patterns = [os.path.join(os.environ.get("APPDATA", ""), "Ableton", "Live *", "Preferences", "Log.txt")]
+    else:
+        patterns = []
+
+    logs = [path for pattern in patterns for path in glob(pattern)]
+    if logs:
+        return os.path.dirname(max(logs, key=os.path.getmtime))
+    return os.path.expanduser("~")
+
+# per function timings of the script's hot paths. Functions decorated with
+# timed only check the enabled flag while profiling is off, so the
+# decorators can stay in place for shows
+class Profiler(object):
+
+    def __init__(self):
+        self.enabled = False
+        self._timers = {}
+        self._started = None
+
+    def start(self):
+        if not self.enabled:
+            self.enabled = True
+            self._started = time.time()
+            logger.info("Profiling started")
+
+    def stop(self):
+        self.enabled = False
+
+    def reset(self):
+        self._timers = {}
+        self._started = time.time() if self.enabled else None
+
+    def timer(self, name):
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = Timer(name)
+        return timer
+
+    def timed(self, name):
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*a, **k):
+                if not self.enabled:
+                    return func(*a, **k)
+                start = time.perf_counter()
+                try:
+                    return func(*a, **k)
+                finally:
+                    self.timer(name).add(time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def format(self):
+        lines = ["Drum Control XL timings, profiling since %s" % time.ctime(self._started or time.time())]
+        for timer in sorted(self._timers.values(), key=lambda timer: -timer.total):
+            lines.append(timer.format())
+        return "\n\n".join(lines) + "\n"
+
+    # returns the path written to, or None if it couldn't be written
+    def dump(self, directory=None):
+        path = os.path.join(directory or live_log_directory(), TIMINGS_FILENAME)
+        try:
+            with open(path, "w") as f:
+                f.write(self.format())
+        except (IOError, OSError) as e:
+            logger.error("Could not write timings to %s: %s" % (path, e))
+            return None
+        logger.info("Timings written to %s" % path)
+        return path
+
+profiler = Profiler()
+
+# the time a unit's startup, or its reconnect, took up to each of its
+# tiers, logged once the surface first answers with its lights
+class StartupTimer(object):
+
+    def __init__(self, name):
+        self.name = name
+        self._started = time.perf_counter()
+        self._marks = []
+
+    def mark(self, tier):
+        self._marks.append((tier, time.perf_counter() - self._started))
+
+    def finish(self):
+        elapsed = time.perf_counter() - self._started
+        tiers = ", ".join("%s %.1f ms" % (tier, seconds * 1000) for tier, seconds in self._marks)
+        logger.info("%s: first response after %.1f ms (%s)" % (self.name, elapsed * 1000, tiers))
+        return elapsed
+
+# decorates a function to be timed under name while profiling is on
+def timed(name):
+    return profiler.timed(name)
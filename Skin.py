@@ -13,18 +13,40 @@ class Colors():
     class DrumGroup():
         SoloOn = Color(60)
         SoloOff = Color(28)
-        MuteOn = Color(29)
-        MuteOff = Color(47)
-        ArmSelected = Color(15)
-        ArmUnselected = Color(13)
+        MuteOn = Color(15)
+        MuteOff = Color(29)
+        ArmSelected = Color(127)
+        ArmUnselected = Color(0)
         PadSelected = Color(62)
         PadUnselected = Color(29)
+        PadArmed = Color(15)
+        PadUnarmed = Color(13)
         NoChain = Color(0)
+        BankAvailable = Color(127)
+        BankUnavailable = Color(0)
+        TrackAvailable = Color(127)
+        TrackUnavailable = Color(0)
         Sends = Color(47)
         Pans = Color(60)
 
+DEFAULT_COLORS = dict((name, color.midi_value) for name, color in vars(Colors.DrumGroup).items() if isinstance(color, Color))
+
+# sets the drum group colors to those of the configuration. The strips
+# send them as they are, so they're replaced where they're defined
+def apply_colors(colors):
+    for name, value in colors.items():
+        setattr(Colors.DrumGroup, name, Color(value))
+
+# a skin that also keeps the midi value of every color by name, so buttons
+# can resolve their on and off colors once instead of on every send
+class CompiledSkin(Skin):
+
+    def __init__(self, colors=None, *a, **k):
+        super(CompiledSkin, self).__init__(colors, *a, **k)
+        self.midi_values = dict((name, int(getattr(color, "midi_value", color))) for name, color in self.iteritems())
+
 def make_skin():
-    return Skin(Colors());
+    return CompiledSkin(Colors());
 
 def make_default_skin():
-    return Skin(Defaults)
+    return CompiledSkin(Defaults)
@@ -0,0 +1,219 @@
+import json
+import os
+import time
+
+from _Framework import Task
+from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+
+from .Profiler import live_log_directory, timed
+
+import logging
+logger = logging.getLogger(__name__)
+
+# beats a recall takes to morph to the snapshot, 0 recalls instantly
+SNAPSHOT_MORPH_BEATS = 4
+SNAPSHOTS_FILENAME = "DrumControlXL_snapshots%s.json"
+SNAPSHOTS_VERSION = 1
+
+# parameter changes smaller than this are not written while morphing
+MIN_PARAMETER_CHANGE = 0.0005
+
+# each unit keeps its snapshots in a file of its own, next to Live's Log.txt
+def snapshot_path(unit_index=0):
+    return os.path.join(live_log_directory(), SNAPSHOTS_FILENAME % ("_%d" % (unit_index + 1) if unit_index else ""))
+
+# one parameter moving from where it was when the recall started to its
+# snapshot value. Quantized parameters jump at the end
+class ParameterMove(object):
+
+    def __init__(self, parameter, target):
+        self.parameter = parameter
+        self.start = parameter.value
+        self.target = max(parameter.min, min(parameter.max, target))
+        self.quantized = getattr(parameter, "is_quantized", False)
+
+    def value_at(self, progress):
+        if self.quantized:
+            return self.target if progress >= 1.0 else self.start
+        return self.start + (self.target - self.start) * progress
+
+# snapshots of the volume, mapped device parameters and mute of the pads
+# bound to the strips. A snapshot holds one entry per pad:
+#
+#   [segment, note, volume, mute, [[parameter index, value], ...]]
+#
+# with parameter indices into the parameters of the device the pad's
+# encoders control, so a snapshot is recalled onto the same pads of
+# whichever racks the segments follow at the time, bound to a strip or not
+class SnapshotComponent(ControlSurfaceComponent):
+
+    def __init__(self, mixer, unit_index=0, path=None, morph_beats=SNAPSHOT_MORPH_BEATS, *a, **k):
+        super(SnapshotComponent, self).__init__(*a, **k)
+        self._mixer = mixer
+        self._morph_beats = morph_beats
+        self._unit_index = unit_index
+        self._path = path
+        self._snapshots = None
+        self._moves = []
+        self._mutes = []
+        self._morph_slot = None
+        self._morph_started = 0.0
+        self._morph_duration = 0.0
+        self._morph_task = self._tasks.add(Task.run(self._morph_step))
+        self._morph_task.kill()
+
+    # read from disk on first use, so startup doesn't wait for the file
+    @property
+    def snapshots(self):
+        if self._snapshots is None:
+            self._snapshots = self._load()
+        return self._snapshots
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = snapshot_path(self._unit_index)
+        return self._path
+
+    def _load(self):
+        path = self.path
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            logger.error("Could not read snapshots from %s: %s" % (path, e))
+            return {}
+        if data.get("version") != SNAPSHOTS_VERSION:
+            logger.warning("Ignoring snapshots of version %r in %s" % (data.get("version"), path))
+            return {}
+        return dict((int(slot), entries) for slot, entries in data.get("snapshots", {}).items())
+
+    def _save(self):
+        path = self.path
+        try:
+            with open(path, "w") as f:
+                json.dump({"version": SNAPSHOTS_VERSION,
+                           "snapshots": dict((str(slot), entries) for slot, entries in self.snapshots.items())},
+                          f, separators=(",", ":"))
+        except (IOError, OSError) as e:
+            logger.error("Could not write snapshots to %s: %s" % (path, e))
+            return False
+        return True
+
+    @timed("SnapshotComponent.store")
+    def store(self, slot):
+        self._stop_morph()
+        entries = []
+        for segment_index, segment in enumerate(self._mixer.segments):
+            for strip, note in zip(segment.strips, segment.bound_notes()):
+                entry = self._capture(segment_index, strip, note)
+                if entry:
+                    entries.append(entry)
+
+        self.snapshots[slot] = entries
+        saved = self._save()
+        self.show_message("Snapshot %d stored%s" % (slot + 1, "" if saved else ", could not save it, see Log.txt"))
+
+    def _capture(self, segment_index, strip, note):
+        chain = strip.chain
+        if note is None or chain is None:
+            return None
+
+        volume, parameters = strip.snapshot_parameters()
+        device_parameters = list(strip.device.parameters) if strip.device else []
+        values = [[device_parameters.index(parameter), parameter.value]
+                  for parameter in parameters if parameter in device_parameters]
+        return [segment_index, note, volume.value, bool(chain.mute), values]
+
+    # recalling the snapshot that's being morphed to again finishes the
+    # morph right away
+    @timed("SnapshotComponent.recall")
+    def recall(self, slot, beats=None):
+        if beats is None:
+            beats = self._morph_beats
+        entries = self.snapshots.get(slot)
+        if not entries:
+            self.show_message("Snapshot %d is empty" % (slot + 1))
+            return
+
+        if self._morph_task.is_running and self._morph_slot == slot:
+            self._finish_morph()
+            self.show_message("Snapshot %d recalled" % (slot + 1))
+            return
+
+        self._stop_morph()
+        self._moves, self._mutes = self._resolve(entries)
+        self._morph_slot = slot
+        self._morph_duration = beats * 60.0 / self.song().tempo if beats > 0 else 0.0
+
+        if not self._morph_duration:
+            self._finish_morph()
+            self.show_message("Snapshot %d recalled" % (slot + 1))
+            return
+
+        # pads being unmuted come in at the start so their volume fades
+        # in, pads being muted go at the end
+        for chain, mute in self._mutes:
+            if not mute and chain.mute:
+                chain.mute = False
+        self._morph_started = time.time()
+        self._morph_task = self._tasks.add(Task.loop(Task.run(self._morph_step)))
+        self.show_message("Morphing to snapshot %d over %g beats" % (slot + 1, beats))
+
+    def _resolve(self, entries):
+        segments = self._mixer.segments
+        moves = []
+        mutes = []
+        for segment_index, note, volume, mute, values in entries:
+            if segment_index >= len(segments):
+                continue
+            chain = segments[segment_index].chain(note)
+            if chain is None:
+                continue
+
+            moves.append(ParameterMove(chain.mixer_device.volume, volume))
+            device = self._mixer.target_device(chain)
+            device_parameters = device.parameters if device else ()
+            for index, value in values:
+                if index < len(device_parameters):
+                    moves.append(ParameterMove(device_parameters[index], value))
+            mutes.append((chain, mute))
+        return moves, mutes
+
+    # every parameter of the morph is computed and written once per tick
+    @timed("SnapshotComponent._morph_step")
+    def _morph_step(self):
+        progress = (time.time() - self._morph_started) / self._morph_duration
+        if progress >= 1.0:
+            self._finish_morph()
+            return
+        self._apply(progress)
+
+    def _finish_morph(self):
+        self._apply(1.0)
+        for chain, mute in self._mutes:
+            if chain != None and chain.mute != mute:
+                chain.mute = mute
+        self._stop_morph()
+
+    def _apply(self, progress):
+        for move in self._moves:
+            parameter = move.parameter
+            if parameter == None:
+                continue
+            value = move.value_at(progress)
+            if abs(parameter.value - value) > MIN_PARAMETER_CHANGE or (progress >= 1.0 and parameter.value != value):
+                parameter.value = value
+
+    def _stop_morph(self):
+        self._morph_task.kill()
+        self._moves = []
+        self._mutes = []
+        self._morph_slot = None
+
+    def disconnect(self):
+        self._stop_morph()
+        self._mixer = None
+        super(SnapshotComponent, self).disconnect()
@@ -0,0 +1,249 @@
+from contextlib import contextmanager
+import json
+import os
+import struct
+import time
+
+from .Profiler import live_log_directory
+
+import logging
+logger = logging.getLogger(__name__)
+
+TRACE_FILENAME = "DrumControlXL_trace.bin"
+TRACE_MAGIC = b"DCXT"
+TRACE_VERSION = 2
+# recording stops by itself once the trace file gets this big
+MAX_TRACE_BYTES = 64 * 1024 * 1024
+
+# the file starts with the magic, the version, the number of units, the
+# wall clock time recording started at and the length of the state block
+# that follows, the surface state recording started from as JSON: track
+# offset, number of tracks followed, bank offset, every unit's mode and
+# the set's shape. Every entry is a header with the seconds since then,
+# the kind, the unit and the payload's length, followed by the payload
+HEADER = struct.Struct("<4sHBdI")
+ENTRY = struct.Struct("<dBBH")
+
+# MIDI received by a unit, sysex included, the payload is the raw bytes
+MIDI = 1
+# a unit's update_display tick, no payload
+TICK = 2
+# a Live listener callback, the payload is the event, the subject's path
+# from the song and its new value, separated by zero bytes. Callbacks that
+# fire while a unit is handling MIDI or a tick are caused by the script
+# itself and are recorded as SCRIPT_LISTENER instead
+LISTENER = 3
+SCRIPT_LISTENER = 4
+
+# listener callbacks aren't tied to a unit
+NO_UNIT = 255
+
+KIND_NAMES = {
+    MIDI: "midi",
+    TICK: "tick",
+    LISTENER: "listener",
+    SCRIPT_LISTENER: "script_listener",
+}
+
+# after these the paths of objects recorded so far may be wrong
+STRUCTURE_EVENTS = ("tracks", "visible_tracks", "return_tracks", "devices", "chains", "drum_pads")
+
+PATH_PROPERTIES = ("view", "master_track", "mixer_device", "volume", "panning")
+PATH_COLLECTIONS = ("tracks", "return_tracks", "devices", "chains", "drum_pads", "parameters", "sends")
+
+def _path_part(parent, obj):
+    for name in PATH_PROPERTIES:
+        value = getattr(parent, name, None)
+        if value is not None and value == obj:
+            return name
+
+    for name in PATH_COLLECTIONS:
+        for index, item in enumerate(getattr(parent, name, None) or ()):
+            if item == obj:
+                return "%s/%d" % (name, index)
+
+    # drum chains have the rack as their parent but live in its pads
+    for pad in getattr(parent, "drum_pads", None) or ():
+        for index, chain in enumerate(pad.chains):
+            if chain == obj:
+                return "drum_pads/%d/chains/%d" % (pad.note, index)
+    return None
+
+# the path of a Live object from the song, like tracks/3/devices/0/chains/2,
+# so it can be looked up again in another set of the same shape. None if
+# it can't be told where the object lives
+def live_object_path(obj):
+    parts = []
+    while True:
+        parent = getattr(obj, "canonical_parent", None)
+        if parent is None:
+            return "/".join(reversed(parts))
+        part = _path_part(parent, obj)
+        if part is None:
+            return None
+        parts.append(part)
+        obj = parent
+
+def resolve_live_object_path(song, path):
+    obj = song
+    parts = path.split("/") if path else []
+    while parts:
+        name = parts.pop(0)
+        if name in PATH_COLLECTIONS and parts:
+            index = int(parts.pop(0))
+            if name == "drum_pads":
+                obj = obj.drum_pads[index]
+            else:
+                obj = list(getattr(obj, name))[index]
+        else:
+            obj = getattr(obj, name)
+    return obj
+
+# records the MIDI every unit receives, its display ticks and the Live
+# listener callbacks to a compact binary trace, which bench/replay.py plays
+# back against the stand-in Live objects. While it isn't recording, the
+# hooks only check the recording flag. Entries are kept in memory and only
+# written to the file by flush, once per display tick outside the timed
+# code, so recording doesn't show up in the timings
+class TraceRecorder(object):
+
+    def __init__(self):
+        self.recording = False
+        self.path = None
+        self._file = None
+        self._started = 0.0
+        self._written = 0
+        self._handling = 0
+        self._paths = {}
+        self._pending = []
+
+    # state is the surface state recording starts from, see HEADER
+    def start(self, num_units=1, directory=None, state=None):
+        if self.recording:
+            return self.path
+        path = os.path.join(directory or live_log_directory(), TRACE_FILENAME)
+        state_bytes = json.dumps(state or {}).encode("utf-8")
+        try:
+            self._file = open(path, "wb")
+            self._file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, num_units, time.time(), len(state_bytes)) + state_bytes)
+        except (IOError, OSError) as e:
+            logger.error("Could not record a trace to %s: %s" % (path, e))
+            self._file = None
+            return None
+
+        self.path = path
+        self.recording = True
+        self._started = time.perf_counter()
+        self._written = HEADER.size + len(state_bytes)
+        self._handling = 0
+        self._paths = {}
+        self._pending = []
+        logger.info("Recording a trace to %s" % path)
+        return path
+
+    # returns the path of the trace, or None if it couldn't be written
+    def stop(self):
+        if not self._file:
+            return None
+        self.recording = False
+        self._paths = {}
+        try:
+            self._write_pending()
+            self._file.close()
+        except (IOError, OSError) as e:
+            logger.error("Could not write the trace to %s: %s" % (self.path, e))
+            return None
+        finally:
+            self._file = None
+        logger.info("Trace of %d bytes written to %s" % (self._written, self.path))
+        return self.path
+
+    def _write(self, kind, unit, payload=b""):
+        if self._written > MAX_TRACE_BYTES:
+            return
+        entry = ENTRY.pack(time.perf_counter() - self._started, kind, unit, len(payload)) + payload
+        self._pending.append(entry)
+        self._written += len(entry)
+
+    def _write_pending(self):
+        pending = self._pending
+        self._pending = []
+        if pending:
+            self._file.write(b"".join(pending))
+
+    def flush(self):
+        if not self._file:
+            return
+        try:
+            self._write_pending()
+        except (IOError, OSError) as e:
+            logger.error("Could not write to the trace %s: %s" % (self.path, e))
+            self.stop()
+            return
+        if self._written > MAX_TRACE_BYTES:
+            logger.warning("Trace reached %d bytes, stopped recording" % self._written)
+            self.stop()
+
+    def midi(self, unit, midi_bytes):
+        self._write(MIDI, unit, bytes(bytearray(midi_bytes)))
+
+    def tick(self, unit):
+        self._write(TICK, unit)
+
+    # paths are walked once per object while recording, until something
+    # changes the structure of the set
+    def _path(self, obj):
+        cached = self._paths.get(id(obj))
+        if cached is not None and cached[0] is obj:
+            return cached[1]
+        path = live_object_path(obj)
+        self._paths[id(obj)] = (obj, path)
+        return path
+
+    def _encode_value(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return json.dumps(value)
+        if getattr(value, "canonical_parent", None) is None:
+            return ""
+        path = self._path(value)
+        return "@" + path if path is not None else ""
+
+    def listener(self, event, subject):
+        path = self._path(subject)
+        if event in STRUCTURE_EVENTS:
+            self._paths = {}
+        if path is None:
+            return
+        value = self._encode_value(getattr(subject, event, None))
+        kind = SCRIPT_LISTENER if self._handling else LISTENER
+        self._write(kind, NO_UNIT, ("%s\0%s\0%s" % (event, path, value)).encode("utf-8"))
+
+    # listener callbacks inside are recorded as caused by the script
+    @contextmanager
+    def handling(self):
+        self._handling += 1
+        try:
+            yield
+        finally:
+            self._handling -= 1
+
+# yields (seconds, kind, unit, payload) for every entry of a trace file,
+# after the header's (version, number of units, start time, state)
+def read_trace(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, num_units, started, state_length = HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError("%s is not a version %d trace" % (path, TRACE_VERSION))
+    state = json.loads(data[HEADER.size:HEADER.size + state_length].decode("utf-8"))
+
+    def entries():
+        offset = HEADER.size + state_length
+        while offset + ENTRY.size <= len(data):
+            seconds, kind, unit, length = ENTRY.unpack_from(data, offset)
+            offset += ENTRY.size
+            yield seconds, kind, unit, data[offset:offset + length]
+            offset += length
+    return (version, num_units, started, state), entries()
+
+tracer = TraceRecorder()
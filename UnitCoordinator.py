@@ -0,0 +1,173 @@
+from .DeviceParameters import DeviceParameterCache
+from .DeviceTarget import DeviceTargetCache
+from .DrumGroupMixerComponent import LAYOUTS, NUM_STRIPS
+from .DrumRackFinder import DrumRackFinder
+from .PadIndex import make_pad_index_cache
+
+import logging
+logger = logging.getLogger(__name__)
+
+# lets several Launch Control XLs running this script act as one wide
+# surface. Unit N controls pads 8N to 8N+7 of the same rack, all units
+# follow the same track and bank, and share one set of pad indices and
+# their listeners. Units are numbered in the order they were loaded.
+# In multi-track mode every unit splits its strips across the racks of
+# the tracks from the track offset on
+class UnitCoordinator(object):
+
+    def __init__(self):
+        self._units = []
+        self._pad_index_cache = make_pad_index_cache()
+        self._device_parameter_cache = DeviceParameterCache()
+        self._device_target_cache = DeviceTargetCache()
+        self._drum_rack_finder = DrumRackFinder(on_invalidated=self._on_drum_rack_search_invalidated)
+        self._num_tracks = 1
+        self._track_offset = 0
+        self._tracks = []
+        self._drum_group_devices = []
+        self._bank_offset = 0
+
+    @property
+    def pad_index_cache(self):
+        return self._pad_index_cache
+
+    @property
+    def device_parameter_cache(self):
+        return self._device_parameter_cache
+
+    @property
+    def device_target_cache(self):
+        return self._device_target_cache
+
+    @property
+    def drum_rack_finder(self):
+        return self._drum_rack_finder
+
+    @property
+    def num_tracks(self):
+        return self._num_tracks
+
+    @property
+    def track_offset(self):
+        return self._track_offset
+
+    @property
+    def bank_offset(self):
+        return self._bank_offset
+
+    @property
+    def units(self):
+        return tuple(self._units)
+
+    @property
+    def num_units(self):
+        return len(self._units)
+
+    @property
+    def bank_size(self):
+        return NUM_STRIPS * max(1, self.num_units)
+
+    def unit_index(self, unit):
+        return self._units.index(unit)
+
+    def register(self, unit):
+        if unit not in self._units:
+            self._units.append(unit)
+            logger.info("Registered unit %d" % self.unit_index(unit))
+        self._update_unit_offsets()
+
+    def unregister(self, unit):
+        if unit in self._units:
+            self._units.remove(unit)
+        self._update_unit_offsets()
+
+        if not self._units:
+            self._pad_index_cache.disconnect()
+            self._device_parameter_cache.disconnect()
+            self._device_target_cache.disconnect()
+            self._drum_rack_finder.disconnect()
+            self._track_offset = 0
+            self._tracks = []
+            self._drum_group_devices = []
+            self._bank_offset = 0
+
+    def _update_unit_offsets(self):
+        self._device_parameter_cache.set_num_units(len(self._units))
+        self._device_target_cache.set_num_units(len(self._units))
+        for index, unit in enumerate(self._units):
+            unit.set_unit_offset(index * NUM_STRIPS, self.bank_size)
+
+    # binds every unit to the tracks from the offset on in a single pass,
+    # looking their drum racks up once for all of them
+    def select_track(self, track_offset, tracks):
+        self._track_offset = track_offset
+        self._bank_offset = 0
+        self._tracks = [tracks[index] if index < len(tracks) else None
+                        for index in range(track_offset, track_offset + self._num_tracks)]
+        self._drum_group_devices = [self._drum_rack_finder.find(track) for track in self._tracks]
+        self._bind_units(self._bank_offset)
+
+    # binds a unit whose components were just built. The first one selects
+    # the session's tracks for every unit, so rack changes on them are
+    # followed from the start, later ones join the tracks already followed
+    def bind_unit(self, unit, track_offset, tracks):
+        if not self._tracks:
+            self.select_track(track_offset, tracks)
+        else:
+            unit.set_controlled_tracks(self._track_offset, self._tracks, self._drum_group_devices, self._bank_offset)
+
+    # a bank offset moves every unit to it, without one the units keep
+    # their bank and only rebind the segments whose rack changed
+    def _bind_units(self, bank_offset=None):
+        for unit in self._units:
+            unit.set_controlled_tracks(self._track_offset, self._tracks, self._drum_group_devices, bank_offset)
+
+    # switches between following 1, 2 or 4 tracks, rebinding from the
+    # current track offset
+    def set_num_tracks(self, num_tracks, tracks):
+        if num_tracks not in LAYOUTS or num_tracks == self._num_tracks:
+            return
+        self._num_tracks = num_tracks
+        for unit in self._units:
+            unit.set_num_tracks(num_tracks)
+        self.select_track(min(self._track_offset, max(0, len(tracks) - 1)), tracks)
+
+    # a device or rack chain on a controlled track changed, rebind only if
+    # that changed which drum rack the track resolves to, so adding an
+    # effect after the rack keeps the current bank. A deleted rack compares
+    # equal to None, so losing the rack always rebinds. Units only rebind
+    # the segment of that track
+    def _on_drum_rack_search_invalidated(self, track):
+        changed = False
+        for index, controlled_track in enumerate(self._tracks):
+            if controlled_track is None or track != controlled_track:
+                continue
+            drum_group_device = self._drum_rack_finder.find(track)
+            old = self._drum_group_devices[index]
+            if drum_group_device is not None and drum_group_device == old:
+                continue
+            self._drum_group_devices[index] = drum_group_device
+            changed = True
+
+        if changed:
+            logger.info("Drum rack of controlled track changed, rebinding")
+            self._bind_units()
+
+    # a unit is scrolling through tracks, the racks bound now will be
+    # left once it settles
+    def track_switch_pending(self):
+        for unit in self._units:
+            unit.cancel_prefetch()
+
+    def select_bank(self, bank_offset):
+        self._bank_offset = bank_offset
+        for unit in self._units:
+            unit.set_bank_offset(bank_offset)
+
+_coordinator = None
+
+def get_coordinator():
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = UnitCoordinator()
+    return _coordinator
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# Headless benchmark of the script against the stand-in Live and _Framework
+# modules in bench/stubs. Builds a synthetic set, drives the surface with
+# the MIDI a Launch Control XL would send and reports, per operation, the
+# latency, the MIDI messages sent back, the Live listeners registered, the
+# objects allocated and the messages Live's own mappings handled without
+# the script seeing them.
+#
+#   python bench/bench.py
+#   python bench/bench.py --tracks 64 --repeat 50 --json results.json
+#   python bench/bench.py --baseline results.json
+from __future__ import print_function
+
+import argparse
+import gc
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bench", "stubs"))
+
+import Live
+from Live.Chain import Chain, DrumChain
+from Live.Device import Device, DeviceType
+from Live.RackDevice import DrumGroupDevice, RackDevice
+from Live.Song import Song
+from Live.Track import Track
+from _Framework.InputControlElement import InputControlElement
+
+PACKAGE = "Drum_Control_XL"
+LIVE_CHANNEL = 8
+CC_STATUS = 176 + LIVE_CHANNEL
+NOTE_ON_STATUS = 144 + LIVE_CHANNEL
+NOTE_OFF_STATUS = 128 + LIVE_CHANNEL
+LIVE_TEMPLATE_SYSEX = (240, 0, 32, 41, 2, 17, 119, LIVE_CHANNEL, 247)
+FACTORY_TEMPLATE_SYSEX = (240, 0, 32, 41, 2, 17, 119, 0, 247)
+
+UP_CC = 104
+DOWN_CC = 105
+LEFT_CC = 106
+RIGHT_CC = 107
+FADER_CCS = list(range(77, 85))
+SELECT_NOTES = list(range(41, 45)) + list(range(57, 61))
+STATE_NOTES = list(range(73, 77)) + list(range(89, 93))
+MODE_NOTES = [107, 108, 106]
+DEVICE_NOTE = 105
+SETTLE_TICKS = 3
+
+# the synthetic set the operations run against by default
+DEFAULT_TRACKS = 32
+DEFAULT_PADS = 128
+
+def load_package():
+    if PACKAGE in sys.modules:
+        return sys.modules[PACKAGE]
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = package
+    spec.loader.exec_module(package)
+    return package
+
+def make_pad_device(note):
+    return Device("Simpler %d" % note, "OriginalSimpler",
+                  parameter_names=["Filter Freq", "Filter Res", "Decay", "Attack", "Gain"])
+
+def make_drum_rack(pads):
+    rack = DrumGroupDevice()
+    for note in range(pads):
+        rack.set_pad_chain(note, DrumChain("Pad %d" % note, [make_pad_device(note)]))
+    return rack
+
+# every fourth track hides its rack in an instrument rack, every eighth has
+# no rack at all, so discovery and empty tracks are part of the numbers
+def make_set(num_tracks, pads):
+    tracks = []
+    for index in range(num_tracks):
+        if index % 8 == 7:
+            devices = [Device("Reverb", "Reverb", DeviceType.audio_effect)]
+        elif index % 4 == 3:
+            devices = [RackDevice(chains=[Chain("Keys", [Device("Operator", "Operator")]),
+                                          Chain("Drums", [make_drum_rack(pads)])])]
+        else:
+            devices = [make_drum_rack(pads), Device("Compressor", "Compressor2", DeviceType.audio_effect)]
+        tracks.append(Track("Track %d" % (index + 1), devices))
+    return Song(tracks)
+
+class CInstance(object):
+
+    def __init__(self, song):
+        self._song = song
+        self.sent = []
+        self.messages = []
+
+    def send_midi(self, midi_bytes):
+        self.sent.append(midi_bytes)
+
+    def show_message(self, message):
+        self.messages.append(message)
+
+    def log_message(self, message):
+        pass
+
+    def song(self):
+        return self._song
+
+class Rig(object):
+
+    def __init__(self, song, units):
+        package = load_package()
+        self.song = song
+        self._package = package
+        self.c_instances = [CInstance(song) for _ in range(units)]
+        self.surfaces = []
+
+    def create(self):
+        self.surfaces = [self._package.create_instance(c_instance) for c_instance in self.c_instances]
+
+    @property
+    def surface(self):
+        return self.surfaces[0]
+
+    @property
+    def mixer(self):
+        return self.surface._drum_group_mixer
+
+    @property
+    def segment(self):
+        return self.mixer.segments[0]
+
+    @property
+    def controlled_rack(self):
+        return self.segment.drum_group_device
+
+    def midi_sent(self):
+        return sum(len(c_instance.sent) for c_instance in self.c_instances)
+
+    def send(self, midi_bytes, surface=None):
+        (surface or self.surface).receive_midi(midi_bytes)
+
+    def press(self, status, identifier, surface=None):
+        self.send((status, identifier, 127), surface)
+        release = NOTE_OFF_STATUS if status == NOTE_ON_STATUS else status
+        self.send((release, identifier, 0), surface)
+
+    def tick(self, count=1):
+        for _ in range(count):
+            for surface in self.surfaces:
+                surface.update_display()
+
+    def start(self):
+        if not self.surfaces:
+            self.create()
+        for surface in self.surfaces:
+            surface.on_identified()
+            surface.receive_midi(LIVE_TEMPLATE_SYSEX)
+        # the components are created when the device confirms the
+        # template, the ticks let the track selection and prefetch run
+        self.tick(12)
+
+    def disconnect(self):
+        for surface in self.surfaces:
+            surface.disconnect()
+        self.surfaces = []
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+class Result(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        self.midi = 0
+        self.blocks = 0
+        self.resolves = 0
+        self.native = 0
+        self.listeners = 0
+
+    def as_dict(self):
+        count = len(self.samples) or 1
+        return {
+            "runs": len(self.samples),
+            "mean_ms": sum(self.samples) / count * 1000.0,
+            "p50_ms": percentile(self.samples, 0.5) * 1000.0 if self.samples else 0.0,
+            "p95_ms": percentile(self.samples, 0.95) * 1000.0 if self.samples else 0.0,
+            "max_ms": max(self.samples) * 1000.0 if self.samples else 0.0,
+            "midi_per_run": self.midi / float(count),
+            "blocks_per_run": self.blocks / float(count),
+            "resolves_per_run": self.resolves / float(count),
+            "native_per_run": self.native / float(count),
+            "listeners": self.listeners,
+        }
+
+# times one operation, the update_display tick that flushes its LEDs is
+# part of the measurement as that's when the MIDI leaves
+def measure(rig, result, operation, allocations):
+    midi_before = rig.midi_sent()
+    cache = load_package().UnitCoordinator.get_coordinator().device_parameter_cache
+    resolves_before = cache.resolved
+    native_before = InputControlElement.native_values
+    if allocations:
+        blocks_before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+
+    start = time.perf_counter()
+    operation()
+    rig.tick()
+    result.samples.append(time.perf_counter() - start)
+
+    result.midi += rig.midi_sent() - midi_before
+    result.resolves += cache.resolved - resolves_before
+    result.native += InputControlElement.native_values - native_before
+    if allocations:
+        blocks_after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        result.blocks += max(0, blocks_after - blocks_before)
+    result.listeners = Live.Base.listener_count()
+
+def scenario_startup(song, units, repeat, allocations):
+    result = Result("startup")
+    for _ in range(repeat):
+        rig = Rig(song, units)
+        measure(rig, result, rig.start, allocations)
+        rig.disconnect()
+    return [result]
+
+def scenario_operations(song, units, num_tracks_followed, repeat, allocations):
+    rig = Rig(song, units)
+    rig.start()
+    rig.surface._coordinator.set_num_tracks(num_tracks_followed, song.visible_tracks)
+    rig.tick()
+    num_tracks = len(song.tracks)
+    results = []
+
+    def run(name, operation):
+        result = Result(name)
+        for index in range(repeat):
+            measure(rig, result, lambda: operation(index), allocations)
+        results.append(result)
+
+    def switch_track(index, steps=1):
+        forward = (index // max(1, (num_tracks - 1) // steps)) % 2 == 0 if num_tracks > steps else True
+        for step in range(steps):
+            rig.press(CC_STATUS, RIGHT_CC if forward else LEFT_CC)
+            rig.tick()
+        # binding waits for the track switch delay
+        rig.tick(SETTLE_TICKS)
+
+    run("track_switch", switch_track)
+    # ten presses a tick apart, as when mashing Track Right
+    run("track_scroll", lambda index: switch_track(index, 10))
+    rig.surface._coordinator.select_track(0, song.visible_tracks)
+    rig.tick()
+
+    # pages up until the last bank and back down, so every press pages
+    page_direction = [UP_CC]
+    def bank_page(index):
+        if not rig.mixer._can_bank_up():
+            page_direction[0] = DOWN_CC
+        elif not rig.mixer._can_bank_down():
+            page_direction[0] = UP_CC
+        rig.press(CC_STATUS, page_direction[0])
+    run("bank_page", bank_page)
+    rig.surface._coordinator.select_bank(0)
+    rig.tick()
+
+    # selects the bound pads in the rack, as clicking them in Live does
+    def pad_select(index):
+        segment = rig.segment
+        notes = [note for note in segment.bound_notes() if note is not None]
+        if notes:
+            rack = segment.drum_group_device
+            rack.view.selected_drum_pad = rack.drum_pads[notes[index % len(notes)]]
+    run("pad_select", pad_select)
+    run("mute_toggle", lambda index: rig.press(NOTE_ON_STATUS, STATE_NOTES[index % len(STATE_NOTES)]))
+    run("mode_switch", lambda index: rig.press(NOTE_ON_STATUS, MODE_NOTES[index % len(MODE_NOTES)]))
+
+    def fader_sweep(index):
+        for value in range(0, 128, 4):
+            for identifier in FADER_CCS:
+                rig.send((CC_STATUS, identifier, value))
+    run("fader_sweep", fader_sweep)
+
+    # the device button held turns every fader into a group volume fader
+    def group_volume(index):
+        rig.send((NOTE_ON_STATUS, DEVICE_NOTE, 127))
+        for value in range(0, 128, 4):
+            rig.send((CC_STATUS, FADER_CCS[index % len(FADER_CCS)], value))
+            rig.tick()
+        rig.send((NOTE_OFF_STATUS, DEVICE_NOTE, 0))
+    run("group_volume", group_volume)
+
+    def rack_edit(index):
+        rack = rig.controlled_rack
+        note = 100 + index % 20
+        if rack.pad(note).chains:
+            rack.set_pad_chain(note, None)
+        else:
+            rack.set_pad_chain(note, DrumChain("Edit %d" % note, [make_pad_device(note)]))
+    run("rack_edit", rack_edit)
+
+    def visible_rack_edit(index):
+        rack = rig.controlled_rack
+        note = rig.segment._pad_index.notes(rig.segment.pad_offset, 1)[0]
+        pad = rack.pad(note)
+        pad.set_chains([])
+        rack.set_pad_chain(note, DrumChain("Replaced %d" % note, [make_pad_device(note)]))
+    run("visible_rack_edit", visible_rack_edit)
+
+    snapshots = rig.surface.snapshots
+    snapshots._path = os.path.join(tempfile.mkdtemp(), "snapshots.json")
+    run("snapshot_store", lambda index: snapshots.store(index % 8))
+    run("snapshot_recall", lambda index: snapshots.recall((index + 1) % 8, beats=0))
+
+    def snapshot_morph_tick(index):
+        if index % 10 == 0:
+            snapshots.recall(index % 8)
+    run("snapshot_morph", snapshot_morph_tick)
+
+    run("template_reenter", lambda index: (rig.send(FACTORY_TEMPLATE_SYSEX), rig.send(LIVE_TEMPLATE_SYSEX)))
+
+    rig.disconnect()
+    teardown = Result("disconnect")
+    teardown.listeners = Live.Base.listener_count()
+    results.append(teardown)
+    return results
+
+def print_results(results, baseline=None):
+    header = "%-18s %6s %9s %9s %9s %9s %8s %9s %8s %8s %9s" % (
+        "operation", "runs", "mean ms", "p50 ms", "p95 ms", "max ms", "midi", "blocks", "resolves", "native", "listeners")
+    print(header)
+    print("-" * len(header))
+    for name, stats in results.items():
+        print("%-18s %6d %9.3f %9.3f %9.3f %9.3f %8.1f %9.1f %8.2f %8.1f %9d" % (
+            name, stats["runs"], stats["mean_ms"], stats["p50_ms"], stats["p95_ms"], stats["max_ms"],
+            stats["midi_per_run"], stats["blocks_per_run"], stats["resolves_per_run"], stats["native_per_run"],
+            stats["listeners"]))
+        old = (baseline or {}).get(name)
+        if old and old["mean_ms"]:
+            print("%-18s %6s %+8.1f%% %9s %9s %9s %+8.1f %+9.1f %+8.2f %+8.1f %+9d" % (
+                "  vs baseline", "", (stats["mean_ms"] / old["mean_ms"] - 1.0) * 100.0, "", "", "",
+                stats["midi_per_run"] - old["midi_per_run"], stats["blocks_per_run"] - old["blocks_per_run"],
+                stats["resolves_per_run"] - old.get("resolves_per_run", 0.0),
+                stats["native_per_run"] - old.get("native_per_run", 0.0),
+                stats["listeners"] - old["listeners"]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=DEFAULT_TRACKS, help="tracks in the synthetic set")
+    parser.add_argument("--pads", type=int, default=DEFAULT_PADS, help="populated pads per drum rack")
+    parser.add_argument("--units", type=int, default=1, help="Launch Control XLs running the script")
+    parser.add_argument("--follow", type=int, default=1, choices=(1, 2, 4), help="tracks followed at once by each unit")
+    parser.add_argument("--repeat", type=int, default=30, help="runs per operation")
+    parser.add_argument("--allocations", action="store_true", help="count allocated blocks, slows everything down")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with results written by --json")
+    parser.add_argument("--verbose", action="store_true", help="show the script's logging")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    load_package()
+    song = make_set(args.tracks, args.pads)
+    if args.allocations:
+        tracemalloc.start()
+    gc.collect()
+
+    results = scenario_startup(song, args.units, max(1, args.repeat // 10), args.allocations)
+    results += scenario_operations(song, args.units, args.follow, args.repeat, args.allocations)
+    results = dict((result.name, result.as_dict()) for result in results)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    print("%d tracks, %d pads per rack, %d unit(s) following %d track(s), %d runs per operation" % (
+        args.tracks, args.pads, args.units, args.follow, args.repeat))
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"tracks": args.tracks, "pads": args.pads, "units": args.units, "follow": args.follow,
+                       "repeat": args.repeat, "results": results}, f, indent=2, sort_keys=True)
+
+    # every listener must be gone once all units disconnected
+    return 1 if results["disconnect"]["listeners"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Replays a trace recorded by the script (press Up and Down together to
+# start and stop recording) against the stand-in Live and _Framework
+# modules in bench/stubs, on a synthetic set like the benchmark's. Every
+# MIDI message, display tick and Live listener callback of the trace is
+# fed to a freshly loaded script in order, and the processing time and
+# MIDI sent back are reported per event. The set has as many tracks and
+# pads as the one recorded unless told otherwise, and the script is put
+# on the tracks, bank and modes the recording started from first.
+#
+#   python bench/replay.py DrumControlXL_trace.bin
+#   python bench/replay.py DrumControlXL_trace.bin --tracks 64 --events
+#
+# Listener callbacks the script caused itself, by handling MIDI or a tick,
+# aren't replayed, the script causes them again. Callbacks whose subject
+# doesn't exist in the synthetic set are skipped and counted.
+from __future__ import print_function
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench
+
+SLOWEST_EVENTS = 10
+
+class Event(object):
+
+    def __init__(self, seconds, kind, unit, description):
+        self.seconds = seconds
+        self.kind = kind
+        self.unit = unit
+        self.description = description
+        self.elapsed = 0.0
+        self.midi = []
+
+def sent_so_far(rig):
+    return [len(c_instance.sent) for c_instance in rig.c_instances]
+
+def sent_since(rig, before):
+    return [midi for c_instance, count in zip(rig.c_instances, before) for midi in c_instance.sent[count:]]
+
+def format_midi(midi_bytes):
+    return " ".join("%02X" % byte for byte in midi_bytes)
+
+# sets the subject's property to the recorded value, which notifies the
+# listeners, or notifies them directly if the value didn't change or
+# wasn't recorded
+def apply_listener(song, trace, payload):
+    event, path, value = payload.decode("utf-8").split("\0")
+    try:
+        subject = trace.resolve_live_object_path(song, path)
+        if value.startswith("@"):
+            value = trace.resolve_live_object_path(song, value[1:])
+        elif value:
+            value = json.loads(value)
+        else:
+            value = None
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+    settable = isinstance(getattr(type(subject), event, None), property) and getattr(type(subject), event).fset
+    if value is not None and settable and getattr(subject, event) != value:
+        setattr(subject, event, value)
+    else:
+        subject.notify(event)
+    return True
+
+# puts the script on the tracks, bank and modes recording started from
+def restore_state(rig, song, state):
+    coordinator = rig.surface._coordinator
+    if "num_tracks" in state:
+        coordinator.set_num_tracks(state["num_tracks"], song.visible_tracks)
+    if "track_offset" in state:
+        coordinator.select_track(state["track_offset"], song.visible_tracks)
+    if "bank_offset" in state:
+        coordinator.select_bank(state["bank_offset"])
+    for surface, mode in zip(rig.surfaces, state.get("modes", [])):
+        if mode and surface._mixer_modes:
+            surface._mixer_modes.selected_mode = mode
+    rig.tick(bench.SETTLE_TICKS)
+
+def replay(path, num_tracks=None, pads=None, events_out=None):
+    package = bench.load_package()
+    trace = package.Trace
+    (version, num_units, started, state), entries = trace.read_trace(path)
+
+    song = bench.make_set(num_tracks or state.get("set_tracks") or bench.DEFAULT_TRACKS,
+                          pads or state.get("pads") or bench.DEFAULT_PADS)
+    rig = bench.Rig(song, max(1, num_units))
+    rig.start()
+    restore_state(rig, song, state)
+
+    events = []
+    skipped = {"script_listener": 0, "unresolved": 0}
+    for seconds, kind, unit, payload in entries:
+        if kind == trace.SCRIPT_LISTENER:
+            skipped["script_listener"] += 1
+            continue
+
+        if kind == trace.MIDI:
+            description = format_midi(bytearray(payload))
+        elif kind == trace.TICK:
+            description = "update_display"
+        else:
+            description = payload.decode("utf-8").replace("\0", " ")
+        event = Event(seconds, trace.KIND_NAMES.get(kind, str(kind)), unit, description)
+
+        before = sent_so_far(rig)
+        start = time.perf_counter()
+        if kind == trace.MIDI:
+            rig.send(tuple(bytearray(payload)), rig.surfaces[unit])
+        elif kind == trace.TICK:
+            rig.surfaces[unit].update_display()
+        elif kind == trace.LISTENER and not apply_listener(song, trace, payload):
+            skipped["unresolved"] += 1
+            continue
+        event.elapsed = time.perf_counter() - start
+        event.midi = sent_since(rig, before)
+        events.append(event)
+
+        if events_out:
+            print("%10.3f s %-8s unit %3d %-44s %8.3f ms %s" % (
+                event.seconds, event.kind, event.unit, event.description[:44], event.elapsed * 1000.0,
+                " | ".join(format_midi(midi) for midi in event.midi)), file=events_out)
+
+    rig.disconnect()
+    listeners = bench.Live.Base.listener_count()
+    return (version, num_units, started, state), events, skipped, listeners
+
+def summarize(events):
+    by_kind = {}
+    for event in events:
+        by_kind.setdefault(event.kind, []).append(event)
+
+    summary = {}
+    for kind, kind_events in sorted(by_kind.items()):
+        samples = [event.elapsed for event in kind_events]
+        summary[kind] = {
+            "events": len(kind_events),
+            "mean_ms": sum(samples) / len(samples) * 1000.0,
+            "p50_ms": bench.percentile(samples, 0.5) * 1000.0,
+            "p95_ms": bench.percentile(samples, 0.95) * 1000.0,
+            "max_ms": max(samples) * 1000.0,
+            "midi_out": sum(len(event.midi) for event in kind_events),
+        }
+    return summary
+
+def print_summary(header, events, skipped, listeners):
+    version, num_units, started, state = header
+    print("trace recorded %s from %s" % (time.ctime(started), json.dumps(state, sort_keys=True)))
+    print("%d unit(s), %d events replayed, %d caused by the script and %d unresolved skipped" % (
+        num_units, len(events), skipped["script_listener"], skipped["unresolved"]))
+
+    line = "%-16s %7s %9s %9s %9s %9s %9s"
+    print(line % ("kind", "events", "mean ms", "p50 ms", "p95 ms", "max ms", "midi out"))
+    print("-" * 74)
+    for kind, stats in summarize(events).items():
+        print("%-16s %7d %9.3f %9.3f %9.3f %9.3f %9d" % (
+            kind, stats["events"], stats["mean_ms"], stats["p50_ms"], stats["p95_ms"], stats["max_ms"], stats["midi_out"]))
+
+    print("\nslowest events:")
+    for event in sorted(events, key=lambda event: -event.elapsed)[:SLOWEST_EVENTS]:
+        print("%10.3f s %-8s unit %3d %-44s %8.3f ms, %d MIDI out" % (
+            event.seconds, event.kind, event.unit, event.description[:44], event.elapsed * 1000.0, len(event.midi)))
+    print("\nlisteners left after disconnect: %d" % listeners)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("trace", help="trace file written by the script")
+    parser.add_argument("--tracks", type=int, help="tracks in the synthetic set, as many as recorded by default")
+    parser.add_argument("--pads", type=int, help="populated pads per drum rack, as many as recorded by default")
+    parser.add_argument("--events", action="store_true", help="print every event with its time and MIDI sent back")
+    parser.add_argument("--json", help="write the per kind summary and every event to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the script's logging")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    header, events, skipped, listeners = replay(args.trace, args.tracks, args.pads, sys.stdout if args.events else None)
+    print_summary(header, events, skipped, listeners)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "summary": summarize(events),
+                "skipped": skipped,
+                "listeners": listeners,
+                "events": [{
+                    "seconds": event.seconds,
+                    "kind": event.kind,
+                    "unit": event.unit,
+                    "description": event.description,
+                    "ms": event.elapsed * 1000.0,
+                    "midi": [list(midi) for midi in event.midi],
+                } for event in events],
+            }, f, indent=2)
+    return 1 if listeners else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+from .Base import LiveObject, View
+
+_application = None
+
+
+class Application(LiveObject):
+
+    def __init__(self):
+        super(Application, self).__init__(None)
+        self.view = View(self)
+
+    def get_major_version(self):
+        return 12
+
+
+def get_application():
+    global _application
+    if _application is None:
+        _application = Application()
+    return _application
@@ -0,0 +1,96 @@
+from collections import defaultdict
+
+LISTENER_EVENTS = defaultdict(int)
+
+
+def listener_count():
+    return sum(LISTENER_EVENTS.values())
+
+
+class LiveObject(object):
+    __events__ = ()
+
+    def __init__(self, canonical_parent=None):
+        self._listeners = defaultdict(list)
+        self._deleted = False
+        self.canonical_parent = canonical_parent
+
+    def __getattr__(self, name):
+        for prefix, suffix, action in (("add_", "_listener", self._add_listener),
+                                       ("remove_", "_listener", self._remove_listener),
+                                       ("", "_has_listener", self._has_listener)):
+            if name.startswith(prefix) and name.endswith(suffix):
+                event = name[len(prefix):-len(suffix)]
+                if event in type(self).__events__:
+                    return lambda listener: action(event, listener)
+        raise AttributeError(name)
+
+    def _add_listener(self, event, listener):
+        if listener in self._listeners[event]:
+            raise RuntimeError("Listener already connected: %s.%s" % (type(self).__name__, event))
+        self._listeners[event].append(listener)
+        LISTENER_EVENTS[event] += 1
+
+    def _remove_listener(self, event, listener):
+        if listener not in self._listeners[event]:
+            raise RuntimeError("Listener not connected: %s.%s" % (type(self).__name__, event))
+        self._listeners[event].remove(listener)
+        LISTENER_EVENTS[event] -= 1
+
+    def _has_listener(self, event, listener):
+        return listener in self._listeners[event]
+
+    def listeners(self, event):
+        return list(self._listeners[event])
+
+    def notify(self, event):
+        for listener in list(self._listeners[event]):
+            listener()
+
+    def delete(self):
+        self._deleted = True
+        for event, listeners in self._listeners.items():
+            LISTENER_EVENTS[event] -= len(listeners)
+        self._listeners.clear()
+
+    def __eq__(self, other):
+        if other is None:
+            return self._deleted
+        return self is other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self)
+
+    def __bool__(self):
+        return not self._deleted
+
+    __nonzero__ = __bool__
+
+
+def observable(name, default=None):
+    attribute = "_" + name
+
+    def getter(self):
+        return getattr(self, attribute, default)
+
+    def setter(self, value):
+        if getattr(self, attribute, default) != value:
+            setattr(self, attribute, value)
+            self.notify(name)
+
+    return property(getter, setter)
+
+
+class View(LiveObject):
+    __events__ = ("selected_track", "selected_drum_pad", "selected_chain", "selected_device")
+
+    selected_track = observable("selected_track")
+    selected_drum_pad = observable("selected_drum_pad")
+    selected_chain = observable("selected_chain")
+    selected_device = observable("selected_device")
+
+    def show_view(self, name):
+        pass
@@ -0,0 +1,38 @@
+from .Base import LiveObject, observable
+from .MixerDevice import MixerDevice
+
+
+class Chain(LiveObject):
+    __events__ = ("devices", "mute", "solo", "name", "color")
+
+    mute = observable("mute", False)
+    solo = observable("solo", False)
+
+    def __init__(self, name="Chain", devices=(), canonical_parent=None):
+        super(Chain, self).__init__(canonical_parent)
+        self.name = name
+        self.mixer_device = MixerDevice(self)
+        self._devices = []
+        for device in devices:
+            self.insert_device(device)
+
+    @property
+    def devices(self):
+        return tuple(self._devices)
+
+    def insert_device(self, device, index=None):
+        device.canonical_parent = self
+        if index is None:
+            self._devices.append(device)
+        else:
+            self._devices.insert(index, device)
+        self.notify("devices")
+
+    def delete_device(self, index):
+        device = self._devices.pop(index)
+        device.delete()
+        self.notify("devices")
+
+
+class DrumChain(Chain):
+    pass
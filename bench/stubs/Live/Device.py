@@ -0,0 +1,37 @@
+from .Base import LiveObject, View, observable
+from .DeviceParameter import DeviceParameter
+
+
+class DeviceType(object):
+    undefined = 0
+    instrument = 1
+    audio_effect = 2
+    midi_effect = 4
+
+
+class Device(LiveObject):
+    __events__ = ("parameters", "name", "is_active")
+
+    can_have_chains = False
+    can_have_drum_pads = False
+
+    def __init__(self, name="Simpler", class_name="OriginalSimpler", type=DeviceType.instrument,
+                 parameter_names=None, canonical_parent=None):
+        super(Device, self).__init__(canonical_parent)
+        self.name = name
+        self.class_name = class_name
+        self.class_display_name = class_name
+        self.type = type
+        self.view = View(self)
+        if parameter_names is None:
+            parameter_names = ["Param %d" % (i + 1) for i in range(8)]
+        self._parameters = [DeviceParameter("Device On", 1.0, canonical_parent=self)] + \
+            [DeviceParameter(name, 0.5, canonical_parent=self) for name in parameter_names]
+
+    @property
+    def parameters(self):
+        return tuple(self._parameters)
+
+    def set_parameters(self, parameters):
+        self._parameters = list(parameters)
+        self.notify("parameters")
@@ -0,0 +1,39 @@
+from .Base import LiveObject, observable
+
+
+class ParameterState(object):
+    enabled = 0
+    irrelevant = 1
+    disabled = 2
+
+
+class DeviceParameter(LiveObject):
+    __events__ = ("value", "name", "state")
+
+    def __init__(self, name, value=0.0, min=0.0, max=1.0, canonical_parent=None):
+        super(DeviceParameter, self).__init__(canonical_parent)
+        self.name = name
+        self.original_name = name
+        self.min = min
+        self.max = max
+        self.is_enabled = True
+        self.is_quantized = False
+        self.state = ParameterState.enabled
+        self._value = value
+        self.writes = 0
+
+    def _get_value(self):
+        return self._value
+
+    def _set_value(self, value):
+        if not self.min <= value <= self.max:
+            raise ValueError("Invalid value %r for %s" % (value, self.name))
+        self.writes += 1
+        if value != self._value:
+            self._value = value
+            self.notify("value")
+
+    value = property(_get_value, _set_value)
+
+    def str_for_value(self, value):
+        return "%.2f" % value
@@ -0,0 +1,27 @@
+from .Base import LiveObject, observable
+
+
+class DrumPad(LiveObject):
+    __events__ = ("chains", "mute", "solo", "name")
+
+    mute = observable("mute", False)
+    solo = observable("solo", False)
+
+    def __init__(self, note, canonical_parent=None):
+        super(DrumPad, self).__init__(canonical_parent)
+        self.note = note
+        self.name = "Pad %d" % note
+        self._chains = []
+
+    @property
+    def chains(self):
+        return tuple(self._chains)
+
+    def set_chains(self, chains):
+        for chain in self._chains:
+            if chain not in chains:
+                chain.delete()
+        for chain in chains:
+            chain.canonical_parent = self.canonical_parent
+        self._chains = list(chains)
+        self.notify("chains")
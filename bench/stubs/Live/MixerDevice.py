@@ -0,0 +1,11 @@
+from .Base import LiveObject
+from .DeviceParameter import DeviceParameter
+
+
+class MixerDevice(LiveObject):
+
+    def __init__(self, canonical_parent=None):
+        super(MixerDevice, self).__init__(canonical_parent)
+        self.volume = DeviceParameter("Volume", 0.85, canonical_parent=self)
+        self.panning = DeviceParameter("Pan", 0.0, -1.0, 1.0, canonical_parent=self)
+        self.sends = ()
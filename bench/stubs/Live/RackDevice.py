@@ -0,0 +1,52 @@
+from .Base import observable
+from .Device import Device, DeviceType
+from .DrumPad import DrumPad
+
+
+class RackDevice(Device):
+    __events__ = Device.__events__ + ("chains", "drum_pads", "visible_drum_pads", "has_drum_pads")
+
+    can_have_chains = True
+
+    def __init__(self, name="Instrument Rack", class_name="InstrumentGroupDevice", chains=(), **k):
+        super(RackDevice, self).__init__(name, class_name, DeviceType.instrument,
+                                         ["Macro %d" % (i + 1) for i in range(8)], **k)
+        self._chains = []
+        for chain in chains:
+            chain.canonical_parent = self
+            self._chains.append(chain)
+
+    @property
+    def chains(self):
+        return tuple(self._chains)
+
+    def set_chains(self, chains):
+        for chain in chains:
+            chain.canonical_parent = self
+        self._chains = list(chains)
+        self.notify("chains")
+
+
+class DrumGroupDevice(RackDevice):
+    can_have_drum_pads = True
+
+    def __init__(self, name="Drum Rack", **k):
+        super(DrumGroupDevice, self).__init__(name, "DrumGroupDevice", **k)
+        self._drum_pads = tuple(DrumPad(note, self) for note in range(128))
+        self.view.selected_drum_pad = self._drum_pads[36]
+
+    @property
+    def drum_pads(self):
+        return self._drum_pads
+
+    def pad(self, note):
+        return self._drum_pads[note]
+
+    def set_pad_chain(self, note, chain):
+        pad = self._drum_pads[note]
+        old = list(pad.chains)
+        pad.set_chains([chain] if chain is not None else [])
+        self._chains = [c for c in self._chains if c not in old]
+        if chain is not None:
+            self._chains.append(chain)
+        self.notify("chains")
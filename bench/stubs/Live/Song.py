@@ -0,0 +1,32 @@
+from .Base import LiveObject, View, observable
+
+
+class Song(LiveObject):
+    __events__ = ("tracks", "visible_tracks", "tempo", "is_playing")
+
+    tempo = observable("tempo", 120.0)
+    is_playing = observable("is_playing", False)
+
+    def __init__(self, tracks=()):
+        super(Song, self).__init__(None)
+        self.view = View(self)
+        self._tracks = []
+        self.return_tracks = ()
+        self.signature_numerator = 4
+        self.signature_denominator = 4
+        self.set_tracks(tracks)
+
+    @property
+    def tracks(self):
+        return tuple(self._tracks)
+
+    @property
+    def visible_tracks(self):
+        return tuple(self._tracks)
+
+    def set_tracks(self, tracks):
+        for track in tracks:
+            track.canonical_parent = self
+        self._tracks = list(tracks)
+        self.notify("tracks")
+        self.notify("visible_tracks")
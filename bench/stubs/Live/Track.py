@@ -0,0 +1,39 @@
+from .Base import LiveObject, View, observable
+from .MixerDevice import MixerDevice
+
+
+class Track(LiveObject):
+    __events__ = ("devices", "arm", "mute", "solo", "name", "color")
+
+    arm = observable("arm", False)
+    mute = observable("mute", False)
+    solo = observable("solo", False)
+
+    can_be_armed = True
+
+    def __init__(self, name="Track", devices=(), canonical_parent=None):
+        super(Track, self).__init__(canonical_parent)
+        self.name = name
+        self.view = View(self)
+        self.mixer_device = MixerDevice(self)
+        self._devices = []
+        for device in devices:
+            device.canonical_parent = self
+            self._devices.append(device)
+
+    @property
+    def devices(self):
+        return tuple(self._devices)
+
+    def insert_device(self, device, index=None):
+        device.canonical_parent = self
+        if index is None:
+            self._devices.append(device)
+        else:
+            self._devices.insert(index, device)
+        self.notify("devices")
+
+    def delete_device(self, index):
+        device = self._devices.pop(index)
+        device.delete()
+        self.notify("devices")
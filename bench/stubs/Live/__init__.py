@@ -0,0 +1,4 @@
+# Stand-in for the parts of Ableton's Live module used by the script.
+# Objects raise like Live does when a listener is added twice or removed
+# without being connected, so leaks and double registrations surface.
+from . import Application, Base, Chain, Device, DeviceParameter, DrumPad, MidiMap, MixerDevice, RackDevice, Song, Track
@@ -0,0 +1,83 @@
+from .InputControlElement import InputControlElement, MIDI_NOTE_TYPE
+from .Skin import Skin
+
+
+class ButtonValue(object):
+    midi_value = 0
+
+    def __init__(self, midi_value=None, *a, **k):
+        super(ButtonValue, self).__init__(*a, **k)
+        if midi_value is not None:
+            self.midi_value = midi_value
+
+    def __int__(self):
+        return self.midi_value
+
+    def __eq__(self, other):
+        try:
+            return self is other or self.midi_value == other.midi_value
+        except AttributeError:
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = object.__hash__
+
+
+ON_VALUE = ButtonValue(127)
+OFF_VALUE = ButtonValue(0)
+
+
+class Color(object):
+
+    def __init__(self, midi_value=0, *a, **k):
+        super(Color, self).__init__(*a, **k)
+        self._midi_value = midi_value
+
+    @property
+    def midi_value(self):
+        return self._midi_value
+
+    def draw(self, interface):
+        interface.send_value(self.midi_value)
+
+
+class ButtonElement(InputControlElement):
+
+    def __init__(self, is_momentary, msg_type, channel, identifier, skin=Skin(), *a, **k):
+        super(ButtonElement, self).__init__(msg_type, channel, identifier, *a, **k)
+        self._is_momentary = is_momentary
+        self._skin = skin
+        self._last_received_value = 0
+
+    def is_momentary(self):
+        return self._is_momentary
+
+    def is_pressed(self):
+        return self._is_momentary and self._last_received_value != 0
+
+    def receive_value(self, value):
+        self._last_received_value = value
+        super(ButtonElement, self).receive_value(value)
+
+    def set_light(self, value):
+        if isinstance(value, str):
+            self._skin[value].draw(self)
+        else:
+            self.send_value(value)
+
+    def turn_on(self):
+        self.send_value(ON_VALUE)
+
+    def turn_off(self):
+        self.send_value(OFF_VALUE)
+
+    def reset(self):
+        self.send_value(0)
+
+    def send_value(self, value, **k):
+        if isinstance(value, Color):
+            value.draw(self)
+        else:
+            super(ButtonElement, self).send_value(value, **k)
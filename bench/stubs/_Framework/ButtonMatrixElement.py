@@ -0,0 +1,31 @@
+class ButtonMatrixElement(object):
+
+    def __init__(self, rows=(), name="", *a, **k):
+        super(ButtonMatrixElement, self).__init__(*a, **k)
+        self._rows = [list(row) for row in rows]
+        self.name = name
+
+    def width(self):
+        return len(self._rows[0]) if self._rows else 0
+
+    def height(self):
+        return len(self._rows)
+
+    def get_button(self, column, row):
+        return self._rows[row][column]
+
+    def __iter__(self):
+        for row in self._rows:
+            for element in row:
+                yield element
+
+    def __len__(self):
+        return self.width() * self.height()
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def reset(self):
+        for element in self:
+            if element is not None:
+                element.reset()
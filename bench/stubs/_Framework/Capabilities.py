@@ -0,0 +1,17 @@
+CONTROLLER_ID_KEY = "controller_id"
+PORTS_KEY = "ports"
+AUTO_LOAD_KEY = "auto_load"
+NOTES_CC = 1
+SCRIPT = 2
+
+
+def controller_id(vendor_id, product_ids, model_name):
+    return {"vendor_id": vendor_id, "product_ids": product_ids, "model_name": model_name}
+
+
+def inport(props=()):
+    return {"props": props}
+
+
+def outport(props=()):
+    return {"props": props}
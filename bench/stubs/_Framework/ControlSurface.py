@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+
+import Live
+from . import Task
+from .InputControlElement import InputControlElement, MIDI_CC_TYPE, MIDI_NOTE_TYPE
+from .SubjectSlot import SlotManager, Subject
+
+TIMER_DELAY = 0.1
+
+
+class ControlSurface(Subject, SlotManager):
+
+    def __init__(self, c_instance=None, *a, **k):
+        super(ControlSurface, self).__init__(*a, **k)
+        self._c_instance = c_instance
+        self._components = []
+        self._controls = []
+        self._control_map = {}
+        self._task_group = Task.TaskGroup(auto_kill=False)
+        self._guard_depth = 0
+
+    @property
+    def _tasks(self):
+        return self._task_group
+
+    @contextmanager
+    def component_guard(self):
+        from .ControlSurfaceComponent import ControlSurfaceComponent
+        old_surface = ControlSurfaceComponent._current_surface
+        old_registry = InputControlElement._registry
+        ControlSurfaceComponent._current_surface = self
+        InputControlElement._registry = self._register_control
+        self._guard_depth += 1
+        try:
+            yield
+        finally:
+            self._guard_depth -= 1
+            ControlSurfaceComponent._current_surface = old_surface
+            InputControlElement._registry = old_registry
+
+    def _register_control(self, control):
+        control._send_midi_callback = self._send_midi
+        self._controls.append(control)
+        key = (control.message_type(), control.message_channel(), control.message_identifier())
+        self._control_map[key] = control
+
+    def _register_component(self, component):
+        self._components.append(component)
+
+    @property
+    def components(self):
+        return tuple(self._components)
+
+    def _send_midi(self, midi_event_bytes, optimized=None):
+        self._c_instance.send_midi(tuple(midi_event_bytes))
+        return True
+
+    def show_message(self, message):
+        self._c_instance.show_message(message)
+
+    def log_message(self, *message):
+        self._c_instance.log_message(" ".join(map(str, message)))
+
+    def song(self):
+        return self._c_instance.song()
+
+    def application(self):
+        return Live.Application.get_application()
+
+    def schedule_message(self, delay_in_ticks, callback, parameter=None):
+        args = () if parameter is None else (parameter,)
+        self._task_group.add(Task.sequence(Task.delay(delay_in_ticks), Task.run(callback, *args)))
+
+    def update_display(self):
+        with self.component_guard():
+            self._task_group.update(TIMER_DELAY)
+
+    def receive_midi(self, midi_bytes):
+        with self.component_guard():
+            if midi_bytes[0] == 240:
+                self.handle_sysex(midi_bytes)
+                return
+            status = midi_bytes[0] & 240
+            channel = midi_bytes[0] & 15
+            msg_type = MIDI_CC_TYPE if status == 176 else MIDI_NOTE_TYPE
+            value = midi_bytes[2] if status != 128 else 0
+            control = self._control_map.get((msg_type, channel, midi_bytes[1]))
+            if control is not None:
+                control.receive_value(value)
+
+    def handle_sysex(self, midi_bytes):
+        pass
+
+    def update(self):
+        for component in self._components:
+            component.update()
+
+    def _disconnect_and_unregister_all_components(self):
+        for component in reversed(self._components):
+            component.disconnect()
+        self._components = []
+
+    def disconnect(self):
+        self._disconnect_and_unregister_all_components()
+        self._task_group.clear()
+        SlotManager.disconnect(self)
@@ -0,0 +1,68 @@
+import Live
+from . import Task
+from .SubjectSlot import SlotManager, Subject
+from .Util import lazy_attribute
+
+
+class ControlSurfaceComponent(SlotManager, Subject):
+    _current_surface = None
+
+    def __init__(self, name="", is_enabled=True, layer=None, *a, **k):
+        super(ControlSurfaceComponent, self).__init__()
+        self.name = name
+        self._is_enabled = is_enabled
+        self._layer = None
+        self._surface = ControlSurfaceComponent._current_surface
+        if self._surface is None:
+            raise AssertionError("%s created outside of component_guard" % type(self).__name__)
+        self._surface._register_component(self)
+        if layer is not None:
+            self.layer = layer
+
+    @lazy_attribute
+    def _tasks(self):
+        tasks = Task.TaskGroup(auto_kill=False)
+        if self._surface is not None:
+            self._surface._tasks.add(tasks)
+        return tasks
+
+    def song(self):
+        return self._surface.song()
+
+    def application(self):
+        return Live.Application.get_application()
+
+    def show_message(self, message):
+        if self._surface is not None:
+            self._surface.show_message(message)
+
+    def is_enabled(self):
+        return self._is_enabled
+
+    def set_enabled(self, enable):
+        if bool(enable) != self._is_enabled:
+            self._is_enabled = bool(enable)
+            self.update()
+
+    def _get_layer(self):
+        return self._layer
+
+    def _set_layer(self, layer):
+        if self._layer is not None:
+            self._layer.release(self)
+        self._layer = layer
+        if layer is not None:
+            layer.grab(self)
+
+    layer = property(_get_layer, _set_layer)
+
+    def update(self):
+        pass
+
+    def disconnect(self):
+        if self._layer is not None:
+            self._layer.release(self)
+            self._layer = None
+        if "_tasks" in self.__dict__:
+            self.__dict__["_tasks"].kill()
+        super(ControlSurfaceComponent, self).disconnect()
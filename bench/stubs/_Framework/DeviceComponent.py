@@ -0,0 +1,51 @@
+from _Generic.Devices import best_of_parameter_bank, device_parameters_to_map
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+instances_created = 0
+
+
+class DeviceComponent(ControlSurfaceComponent):
+
+    def __init__(self, device_selection_follows_track_selection=False, *a, **k):
+        global instances_created
+        instances_created += 1
+        self._device = None
+        self._locked = False
+        self._parameter_controls = None
+        super(DeviceComponent, self).__init__(*a, **k)
+
+    def set_lock_to_device(self, lock, device):
+        self._locked = lock
+        self._device = device
+        self.update()
+
+    def set_device(self, device):
+        self._device = device
+        self.update()
+
+    def set_parameter_controls(self, controls):
+        self._release()
+        self._parameter_controls = controls
+        self.update()
+
+    def _release(self):
+        for control in self._parameter_controls or ():
+            if control is not None:
+                control.release_parameter()
+
+    def update(self):
+        if not self.is_enabled() or self._device is None or not self._parameter_controls:
+            return
+        bank = best_of_parameter_bank(self._device) or device_parameters_to_map(self._device)
+        for control, parameter in zip(self._parameter_controls, list(bank) + [None] * len(self._parameter_controls)):
+            if control is not None:
+                if parameter is not None:
+                    control.connect_to(parameter)
+                else:
+                    control.release_parameter()
+
+    def disconnect(self):
+        self._release()
+        self._device = None
+        self._parameter_controls = None
+        super(DeviceComponent, self).disconnect()
@@ -0,0 +1,8 @@
+from .InputControlElement import InputControlElement
+
+
+class EncoderElement(InputControlElement):
+
+    def __init__(self, msg_type, channel, identifier, map_mode, *a, **k):
+        super(EncoderElement, self).__init__(msg_type, channel, identifier, *a, **k)
+        self._map_mode = map_mode
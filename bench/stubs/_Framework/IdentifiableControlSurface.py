@@ -0,0 +1,14 @@
+from .ControlSurface import ControlSurface
+
+
+class IdentifiableControlSurface(ControlSurface):
+
+    def __init__(self, product_id_bytes=None, *a, **k):
+        super(IdentifiableControlSurface, self).__init__(*a, **k)
+        self._product_id_bytes = product_id_bytes
+
+    def on_identified(self):
+        pass
+
+    def port_settings_changed(self):
+        self.on_identified()
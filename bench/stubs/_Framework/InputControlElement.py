@@ -0,0 +1,88 @@
+from .SubjectSlot import Subject
+
+MIDI_NOTE_TYPE = 0
+MIDI_CC_TYPE = 1
+MIDI_PB_TYPE = 2
+MIDI_SYSEX_TYPE = 3
+
+MIDI_NOTE_ON_STATUS = 144
+MIDI_NOTE_OFF_STATUS = 128
+MIDI_CC_STATUS = 176
+
+
+class InputControlElement(Subject):
+    _send_midi_callback = None
+
+    def __init__(self, msg_type, channel, identifier, name="", *a, **k):
+        super(InputControlElement, self).__init__()
+        self._msg_type = msg_type
+        self._msg_channel = channel
+        self._msg_identifier = identifier
+        self._original_identifier = identifier
+        self.name = name
+        self._parameter_to_map_to = None
+        self._last_sent_value = -1
+        self._value_listeners = []
+        self.messages_sent = 0
+        if InputControlElement._registry is not None:
+            InputControlElement._registry(self)
+
+    _registry = None
+
+    def message_type(self):
+        return self._msg_type
+
+    def message_channel(self):
+        return self._msg_channel
+
+    def message_identifier(self):
+        return self._msg_identifier
+
+    def add_value_listener(self, listener):
+        if listener in self._value_listeners:
+            raise RuntimeError("Listener already connected")
+        self._value_listeners.append(listener)
+
+    def remove_value_listener(self, listener):
+        self._value_listeners.remove(listener)
+
+    def value_has_listener(self, listener):
+        return listener in self._value_listeners
+
+    def connect_to(self, parameter):
+        self._parameter_to_map_to = parameter
+
+    def release_parameter(self):
+        self._parameter_to_map_to = None
+
+    def mapped_parameter(self):
+        return self._parameter_to_map_to
+
+    # Live moves the parameter of a mapped control itself, its messages
+    # never reach the script. native_values counts them, so the bench can
+    # tell them from the values the script handles
+    native_values = 0
+
+    def receive_value(self, value):
+        parameter = self._parameter_to_map_to
+        if parameter is not None:
+            parameter.value = parameter.min + (parameter.max - parameter.min) * value / 127.0
+            InputControlElement.native_values += 1
+            return
+        for listener in list(self._value_listeners):
+            listener(value)
+
+    def send_value(self, value, force=False, channel=None):
+        value = int(value)
+        if force or value != self._last_sent_value:
+            status = MIDI_CC_STATUS if self._msg_type == MIDI_CC_TYPE else MIDI_NOTE_ON_STATUS
+            if self._send_midi_callback is not None:
+                self._send_midi_callback((status + self._msg_channel, self._original_identifier, value))
+            self._last_sent_value = value
+            self.messages_sent += 1
+
+    def reset(self):
+        pass
+
+    def disconnect(self):
+        self._value_listeners = []
@@ -0,0 +1,12 @@
+class Layer(object):
+
+    def __init__(self, priority=None, **controls):
+        self._controls = controls
+
+    def grab(self, client):
+        for name, control in self._controls.items():
+            getattr(client, "set_" + name)(control)
+
+    def release(self, client):
+        for name in self._controls:
+            getattr(client, "set_" + name)(None)
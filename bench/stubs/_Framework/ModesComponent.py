@@ -0,0 +1,83 @@
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class Mode(object):
+
+    def enter_mode(self):
+        pass
+
+    def leave_mode(self):
+        pass
+
+
+class AddLayerMode(Mode):
+
+    def __init__(self, component=None, layer=None, *a, **k):
+        super(AddLayerMode, self).__init__(*a, **k)
+        self._component = component
+        self._layer = layer
+
+    def enter_mode(self):
+        self._layer.grab(self._component)
+
+    def leave_mode(self):
+        self._layer.release(self._component)
+
+
+class ModeButtonBehaviour(object):
+    pass
+
+
+class ModesComponent(ControlSurfaceComponent):
+
+    def __init__(self, *a, **k):
+        self._modes = {}
+        self._mode_buttons = {}
+        self._selected_mode = None
+        super(ModesComponent, self).__init__(*a, **k)
+
+    def add_mode(self, name, mode_or_component, behaviour=None, **k):
+        modes = mode_or_component if isinstance(mode_or_component, (list, tuple)) else [mode_or_component]
+        self._modes[name] = modes
+
+    def _get_selected_mode(self):
+        return self._selected_mode
+
+    def _set_selected_mode(self, mode):
+        if mode == self._selected_mode:
+            return
+        if self._selected_mode is not None:
+            for m in self._modes[self._selected_mode]:
+                m.leave_mode()
+        self._selected_mode = mode
+        if mode is not None:
+            for m in self._modes[mode]:
+                m.enter_mode()
+
+    selected_mode = property(_get_selected_mode, _set_selected_mode)
+
+    def __getattr__(self, name):
+        if name.startswith("set_") and name.endswith("_button"):
+            mode = name[len("set_"):-len("_button")]
+            if mode in self.__dict__.get("_modes", {}):
+                return lambda button: self._set_mode_button(mode, button)
+        raise AttributeError(name)
+
+    def _set_mode_button(self, mode, button):
+        old = self._mode_buttons.pop(mode, None)
+        if old is not None:
+            old[0].remove_value_listener(old[1])
+        if button is not None:
+            def listener(value):
+                if value:
+                    self.selected_mode = mode
+            button.add_value_listener(listener)
+            self._mode_buttons[mode] = (button, listener)
+
+    def disconnect(self):
+        for mode in list(self._mode_buttons):
+            self._set_mode_button(mode, None)
+        if self._selected_mode is not None:
+            for m in self._modes[self._selected_mode]:
+                m.leave_mode()
+        super(ModesComponent, self).disconnect()
@@ -0,0 +1,69 @@
+from .ControlSurfaceComponent import ControlSurfaceComponent
+
+
+class SessionComponent(ControlSurfaceComponent):
+
+    def __init__(self, num_tracks=0, num_scenes=0, auto_name=False, enable_skinning=False, *a, **k):
+        self._num_tracks = num_tracks
+        self._num_scenes = num_scenes
+        self._track_offset = 0
+        self._scene_offset = 0
+        self._offset_listeners = []
+        self._bank_slots = {}
+        super(SessionComponent, self).__init__(*a, **k)
+
+    def add_offset_listener(self, listener):
+        self._offset_listeners.append(listener)
+
+    def remove_offset_listener(self, listener):
+        self._offset_listeners.remove(listener)
+
+    def offset_has_listener(self, listener):
+        return listener in self._offset_listeners
+
+    def width(self):
+        return self._num_tracks
+
+    def track_offset(self):
+        return self._track_offset
+
+    def scene_offset(self):
+        return self._scene_offset
+
+    def tracks_to_use(self):
+        return self.song().visible_tracks
+
+    @property
+    def current_tracks(self):
+        tracks = self.tracks_to_use()
+        return tracks[self._track_offset:self._track_offset + self._num_tracks]
+
+    def set_offsets(self, track_offset, scene_offset):
+        track_offset = max(0, min(track_offset, len(self.tracks_to_use()) - 1))
+        if (track_offset, scene_offset) != (self._track_offset, self._scene_offset):
+            self._track_offset = track_offset
+            self._scene_offset = scene_offset
+            for listener in list(self._offset_listeners):
+                listener()
+
+    def _set_bank_button(self, name, button, step):
+        old = self._bank_slots.pop(name, None)
+        if old is not None:
+            old[0].remove_value_listener(old[1])
+        if button is not None:
+            def listener(value):
+                if value:
+                    self.set_offsets(self._track_offset + step, self._scene_offset)
+            button.add_value_listener(listener)
+            self._bank_slots[name] = (button, listener)
+
+    def set_track_bank_left_button(self, button):
+        self._set_bank_button("left", button, -1)
+
+    def set_track_bank_right_button(self, button):
+        self._set_bank_button("right", button, 1)
+
+    def disconnect(self):
+        for name in list(self._bank_slots):
+            self._set_bank_button(name, None, 0)
+        super(SessionComponent, self).disconnect()
@@ -0,0 +1,31 @@
+class SkinColorMissingError(Exception):
+    pass
+
+
+class Skin(object):
+
+    def __init__(self, colors=None, *a, **k):
+        super(Skin, self).__init__(*a, **k)
+        self._colors = {}
+        if colors is not None:
+            self._fill_colors(colors)
+
+    def _fill_colors(self, colors, pathname=""):
+        for name in dir(colors):
+            if name.startswith("_"):
+                continue
+            value = getattr(colors, name)
+            if isinstance(value, type):
+                self._fill_colors(value, pathname + name + ".")
+            else:
+                self._colors[pathname + name] = value
+
+    def __getitem__(self, key):
+        if key not in self._colors:
+            raise SkinColorMissingError("Skin color missing: %s" % str(key))
+        return self._colors[key]
+
+    def iteritems(self):
+        return iter(self._colors.items())
+
+    items = iteritems
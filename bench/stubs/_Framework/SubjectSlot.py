@@ -0,0 +1,147 @@
+# Minimal subject/slot machinery modelled on _Framework.SubjectSlot
+
+
+class Subject(object):
+    __events__ = ()
+
+    def __getattr__(self, name):
+        events = type(self).__events__
+        if name.startswith("notify_") and name[len("notify_"):] in events:
+            event = name[len("notify_"):]
+            return lambda *a: [listener(*a) for listener in list(self._subject_listeners(event))] and None
+        for prefix, suffix in (("add_", "_listener"), ("remove_", "_listener"), ("", "_has_listener")):
+            if name.startswith(prefix) and name.endswith(suffix) and name[len(prefix):-len(suffix)] in events:
+                event = name[len(prefix):-len(suffix)]
+                listeners = self._subject_listeners(event)
+                if prefix == "add_":
+                    return listeners.append
+                if prefix == "remove_":
+                    return listeners.remove
+                return lambda listener: listener in listeners
+        raise AttributeError(name)
+
+    def _subject_listeners(self, event):
+        registry = self.__dict__.setdefault("_subject_listener_map", {})
+        return registry.setdefault(event, [])
+
+
+class SubjectSlot(object):
+
+    def __init__(self, subject=None, listener=None, event=None, extra_kws=None, extra_args=None):
+        self._subject = None
+        self._event = event
+        self._listener = listener
+        self._extra_args = extra_args or ()
+        self.subject = subject
+
+    def _notify(self, *a):
+        if self._listener is not None:
+            self._listener(*(self._extra_args + a))
+
+    def _connect(self):
+        if self._subject is not None:
+            getattr(self._subject, "add_%s_listener" % self._event)(self._notify)
+
+    def _disconnect(self):
+        if self._subject is not None:
+            remove = getattr(self._subject, "remove_%s_listener" % self._event)
+            has = getattr(self._subject, "%s_has_listener" % self._event, None)
+            if has is None or has(self._notify):
+                remove(self._notify)
+
+    def _get_subject(self):
+        return self._subject
+
+    def _set_subject(self, subject):
+        if subject is not self._subject:
+            self._disconnect()
+            self._subject = subject
+            self._connect()
+
+    subject = property(_get_subject, _set_subject)
+
+    def _get_listener(self):
+        return self._listener
+
+    def _set_listener(self, listener):
+        self._listener = listener
+
+    listener = property(_get_listener, _set_listener)
+
+    def disconnect(self):
+        self.subject = None
+
+    def __call__(self, *a):
+        return self._notify(*a)
+
+
+class SubjectSlotGroup(object):
+
+    def __init__(self, listener=None, event=None):
+        self._listener = listener
+        self._event = event
+        self._slots = []
+
+    def replace_subjects(self, subjects, identifiers=None):
+        self.disconnect()
+        subjects = list(subjects)
+        identifiers = identifiers if identifiers is not None else subjects
+        for subject, identifier in zip(subjects, identifiers):
+            def listener(identifier=identifier):
+                return self._listener(identifier)
+            self._slots.append(SubjectSlot(subject, listener, self._event))
+
+    def disconnect(self):
+        for slot in self._slots:
+            slot.disconnect()
+        self._slots = []
+
+
+class SlotManager(object):
+
+    def __init__(self, *a, **k):
+        super(SlotManager, self).__init__(*a, **k)
+        self._registered_slots = []
+
+    def register_slot(self, *a, **k):
+        slot = a[0] if len(a) == 1 and isinstance(a[0], (SubjectSlot, SubjectSlotGroup)) else SubjectSlot(*a, **k)
+        self._registered_slots.append(slot)
+        return slot
+
+    def register_slot_manager(self, manager):
+        self._registered_slots.append(manager)
+        return manager
+
+    def disconnect(self):
+        for slot in self._registered_slots:
+            slot.disconnect()
+        self._registered_slots = []
+
+
+class _SlotDescriptor(object):
+
+    def __init__(self, func, event, factory):
+        self._func = func
+        self._event = event
+        self._factory = factory
+        self._name = "_slot_" + func.__name__ + "_%d" % id(self)
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        slot = obj.__dict__.get(self._name)
+        if slot is None:
+            listener = self._func.__get__(obj, cls)
+            slot = self._factory(listener=listener, event=self._event)
+            obj.__dict__[self._name] = slot
+            if isinstance(obj, SlotManager):
+                obj.register_slot(slot)
+        return slot
+
+
+def subject_slot(event):
+    return lambda func: _SlotDescriptor(func, event, SubjectSlot)
+
+
+def subject_slot_group(event):
+    return lambda func: _SlotDescriptor(func, event, SubjectSlotGroup)
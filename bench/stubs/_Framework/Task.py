@@ -0,0 +1,178 @@
+# Cut down _Framework.Task: a group is ticked from update_display and every
+# task is advanced by the elapsed time (in seconds) on each tick.
+
+RUNNING = 0
+PAUSED = 1
+KILLED = 2
+
+
+class Task(object):
+
+    def __init__(self, *a, **k):
+        super(Task, self).__init__(*a, **k)
+        self._state = RUNNING
+        self._parent = None
+
+    @property
+    def is_running(self):
+        return self._state == RUNNING
+
+    @property
+    def is_paused(self):
+        return self._state == PAUSED
+
+    @property
+    def is_killed(self):
+        return self._state == KILLED
+
+    def kill(self):
+        self._state = KILLED
+        return self
+
+    def pause(self):
+        if self._state == RUNNING:
+            self._state = PAUSED
+        return self
+
+    def resume(self):
+        if self._state == PAUSED:
+            self._state = RUNNING
+        return self
+
+    def restart(self):
+        self.do_restart()
+        self._state = RUNNING
+        return self
+
+    def do_restart(self):
+        pass
+
+    def update(self, delta):
+        if self._state == RUNNING:
+            if self.do_update(delta) is not None:
+                self._state = KILLED
+        return self._state
+
+    def do_update(self, delta):
+        return KILLED
+
+
+class FuncTask(Task):
+
+    def __init__(self, func=None, *a, **k):
+        super(FuncTask, self).__init__(*a, **k)
+        self._func = func
+
+    def do_update(self, delta):
+        return self._func(delta)
+
+
+class WaitTask(Task):
+
+    def __init__(self, duration=1.0, *a, **k):
+        super(WaitTask, self).__init__(*a, **k)
+        self._duration = duration
+        self._remaining = duration
+
+    def do_restart(self):
+        self._remaining = self._duration
+
+    def do_update(self, delta):
+        self._remaining -= delta
+        if self._remaining <= 0:
+            return KILLED
+
+
+class DelayTask(Task):
+
+    def __init__(self, ticks=1, *a, **k):
+        super(DelayTask, self).__init__(*a, **k)
+        self._ticks = ticks
+        self._remaining = ticks
+
+    def do_restart(self):
+        self._remaining = self._ticks
+
+    def do_update(self, delta):
+        self._remaining -= 1
+        if self._remaining <= 0:
+            return KILLED
+
+
+class SequenceTask(Task):
+
+    def __init__(self, tasks=(), *a, **k):
+        super(SequenceTask, self).__init__(*a, **k)
+        self._tasks = list(tasks)
+        self._index = 0
+
+    def do_restart(self):
+        self._index = 0
+        for task in self._tasks:
+            task.restart()
+
+    def do_update(self, delta):
+        while self._index < len(self._tasks):
+            task = self._tasks[self._index]
+            if task.update(delta) != KILLED:
+                return None
+            self._index += 1
+            delta = 0
+        return KILLED
+
+
+class TaskGroup(Task):
+
+    def __init__(self, tasks=(), auto_kill=True, auto_remove=True, *a, **k):
+        super(TaskGroup, self).__init__(*a, **k)
+        self._tasks = list(tasks)
+        self._auto_kill = auto_kill
+        self._auto_remove = auto_remove
+
+    def add(self, task):
+        if not isinstance(task, Task):
+            task = FuncTask(task)
+        self._tasks.append(task)
+        return task
+
+    def clear(self):
+        for task in self._tasks:
+            task.kill()
+        self._tasks = []
+
+    @property
+    def count(self):
+        return len(self._tasks)
+
+    def do_update(self, delta):
+        for task in list(self._tasks):
+            task.update(delta)
+        if self._auto_remove:
+            self._tasks = [t for t in self._tasks if not t.is_killed]
+        if self._auto_kill and not self._tasks:
+            return KILLED
+
+
+def sequence(*tasks):
+    return SequenceTask([t if isinstance(t, Task) else FuncTask(t) for t in tasks])
+
+
+def wait(duration):
+    return WaitTask(duration)
+
+
+def delay(ticks):
+    return DelayTask(ticks)
+
+
+def run(func, *a, **k):
+    return FuncTask(lambda delta: func(*a, **k) and None or KILLED)
+
+
+def loop(*tasks):
+    seq = sequence(*tasks)
+
+    def step(delta):
+        if seq.update(delta) == KILLED:
+            seq.restart()
+    return FuncTask(step)
@@ -0,0 +1,33 @@
+from functools import wraps
+
+
+def find_if(predicate, seq):
+    for x in seq:
+        if predicate(x):
+            return x
+
+
+def clamp(value, minv, maxv):
+    return max(minv, min(value, maxv))
+
+
+def lazy_attribute(func):
+    name = func.__name__
+
+    class LazyAttribute(object):
+        def __get__(self, obj, cls=None):
+            if obj is None:
+                return self
+            value = func(obj)
+            obj.__dict__[name] = value
+            return value
+
+    return LazyAttribute()
+
+
+def nop(*a, **k):
+    pass
+
+
+def const(value):
+    return lambda *a, **k: value
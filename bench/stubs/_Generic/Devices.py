@@ -0,0 +1,15 @@
+DEVICE_BOB_DICT = {
+    "OriginalSimpler": ("Filter Freq", "Filter Res", "Decay"),
+}
+
+
+def device_parameters_to_map(device):
+    return tuple(device.parameters[1:])
+
+
+def best_of_parameter_bank(device):
+    names = DEVICE_BOB_DICT.get(device.class_name)
+    if not names:
+        return ()
+    by_name = dict((p.original_name, p) for p in device.parameters)
+    return tuple(by_name.get(name) for name in names)